@@ -5,19 +5,48 @@ Outputs: terminal summary, JSON, CSV files, HTML report with Chart.js.
 Usage: python analyze_ive.py
 """
 
+import argparse
+import base64
+import contextlib
 import csv
+import decimal
+import gzip
+import hashlib
+import heapq
+import io
 import json
-import math
+import mmap
+import multiprocessing
+import os
+import pickle
+import random
 import re
-import statistics
+import sqlite3
+import struct
 import sys
+import threading
+import time
+import tracemalloc
+import urllib.parse
+from array import array
+from bisect import bisect_left, bisect_right
 from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from itertools import accumulate, islice
 from datetime import datetime
+from functools import lru_cache, partial
+from http.server import BaseHTTPRequestHandler, HTTPServer
 from pathlib import Path
 
+try:
+    import ijson  # optional: C-backed streaming JSON parser
+except ImportError:
+    ijson = None
+
 sys.stdout.reconfigure(encoding="utf-8", errors="replace")
 
 BASE_DIR = Path(__file__).parent
+CACHE_DIRNAME = ".ive_cache"
 
 MEMBER_PATTERNS = {
     "WONYOUNG": [r"wonyoung", r"원영", r"장원영", r"JANGWONYOUNG", r"张元英", r"ウォニョン"],
@@ -44,22 +73,109 @@ MEMBER_COLORS = {
 # ─── Data Loading ───────────────────────────────────────────────────────────
 
 
-def parse_views(view_str: str) -> int:
-    if not view_str:
-        return 0
-    clean = view_str.replace(" views", "").replace(",", "").strip()
+PARSE_CACHE_SIZE = 1 << 16  # distinct raw count strings remembered per format
+
+# Scraped count formats: (suffix pattern, multiplier), tried in order. View
+# strings look for the suffix anywhere ("1.2M views"); Douyin counts use 万
+# (10,000) as well as K / M.
+VIEW_SUFFIXES = [(re.compile(r"[Bb]"), 1e9), (re.compile(r"[Mm]"), 1e6), (re.compile(r"[Kk]"), 1e3)]
+DOUYIN_SUFFIXES = [(re.compile("万"), 10000), (re.compile(r"[Kk]"), 1000), (re.compile(r"[Mm]"), 1_000_000)]
+_VIEW_NOISE = re.compile(r" views|,|[KMBkmb]")
+
+
+def _view_count(view_str: str) -> int | None:
+    """'1.2M views' -> 1200000; None when unreadable."""
     try:
-        num = float(re.sub(r"[KMBkmb]", "", clean))
-        if "B" in view_str or "b" in view_str:
-            num *= 1e9
-        elif "M" in view_str or "m" in view_str:
-            num *= 1e6
-        elif "K" in view_str or "k" in view_str:
-            num *= 1e3
+        num = float(_VIEW_NOISE.sub("", view_str))
+        for pattern, mult in VIEW_SUFFIXES:
+            if pattern.search(view_str):
+                return int(num * mult)
         return int(num)
-    except (ValueError, TypeError):
+    except (ValueError, OverflowError):
+        return None
+
+
+def _douyin_count(val: str) -> int | None:
+    """'3.4万' -> 34000, '1.2K' -> 1200; None when unreadable."""
+    clean = val.replace(",", "").strip()
+    try:
+        for pattern, mult in DOUYIN_SUFFIXES:
+            if pattern.search(clean):
+                return int(float(pattern.sub("", clean)) * mult)
+        return int(float(clean))
+    except (ValueError, OverflowError):
+        return None
+
+
+class CountParser:
+    """Memoized parser for one scraped count format.
+
+    Raw strings repeat heavily across videos, so each distinct string is
+    parsed once and kept in an LRU cache. Numbers pass straight through;
+    empty / missing values are 0. Unreadable strings also become 0, but
+    are counted in ``unparsable`` (a few kept in ``samples``).
+    """
+
+    SAMPLES = 5
+
+    def __init__(self, name: str, parse_one, maxsize: int = PARSE_CACHE_SIZE):
+        self.name = name
+        self._cached = lru_cache(maxsize=maxsize)(parse_one)
+        self.unparsable = 0
+        self.samples = []
+
+    def _bad(self, val):
+        self.unparsable += 1
+        if len(self.samples) < self.SAMPLES and val not in self.samples:
+            self.samples.append(val)
+        return 0
+
+    def parse(self, val) -> int:
+        if isinstance(val, str):
+            if not val:
+                return 0
+            n = self._cached(val)
+            return self._bad(val) if n is None else n
+        if isinstance(val, (int, float)):
+            return int(val)
         return 0
 
+    __call__ = parse
+
+    def column(self, values) -> array:
+        """Parse a whole column of raw values into an ``array('q')``."""
+        cached, parse = self._cached, self.parse
+        out = array("q")
+        for val in values:
+            cls = val.__class__
+            if cls is int:
+                out.append(val)
+                continue
+            n = cached(val) if cls is str and val else parse(val)
+            out.append(self._bad(val) if n is None else n)
+        return out
+
+    def cache_info(self):
+        return self._cached.cache_info()
+
+    def reset(self):
+        """Forget cached strings and unparsable counts (start of a new load)."""
+        self._cached.cache_clear()
+        self.unparsable = 0
+        self.samples = []
+
+
+VIEW_COUNTS = CountParser("views", _view_count)
+DOUYIN_COUNTS = CountParser("douyin", _douyin_count)
+
+
+def parse_views(view_str: str) -> int:
+    return VIEW_COUNTS.parse(view_str)
+
+
+def parse_douyin_likes(val) -> int:
+    return DOUYIN_COUNTS.parse(val)
+
 
 def tiktok_id_to_date(video_id: str) -> datetime | None:
     try:
@@ -72,261 +188,2070 @@ def tiktok_id_to_date(video_id: str) -> datetime | None:
 
 
 def detect_members(title: str) -> list[str]:
-    if not title:
-        return ["GROUP/UNKNOWN"]
-    found = []
-    for member, patterns in MEMBER_PATTERNS.items():
-        for pat in patterns:
-            if re.search(pat, title, re.IGNORECASE):
-                found.append(member)
-                break
-    return found if found else ["GROUP/UNKNOWN"]
+    return member_matcher().match(title)
+
+
+# ─── Member Tagging ─────────────────────────────────────────────────────────
+
+
+_REGEX_META = re.compile(r"[\\.^$*+?{}\[\]|()]")
+
+
+class MemberMatcher:
+    """All member aliases compiled into a single matcher.
+
+    Plain-text aliases go into an Aho-Corasick automaton over the lowercased
+    title; anything with regex syntax (the word-boundary aliases) goes into one combined
+    pattern of zero-width lookaheads, so overlapping hits are still seen.
+    Each title is scanned once per engine and ``match`` returns the same list
+    as running every pattern with ``re.search(..., re.IGNORECASE)``.
+    """
+
+    def __init__(self, patterns: dict | None = None):
+        patterns = MEMBER_PATTERNS if patterns is None else patterns
+        self.members = list(patterns)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [0]
+        regex_parts = []
+        self._group_member = {}
+        for bit, (member, pats) in enumerate(patterns.items()):
+            for pat in pats:
+                if _REGEX_META.search(pat):
+                    group = f"g{len(regex_parts)}"
+                    self._group_member[group] = 1 << bit
+                    regex_parts.append(f"(?P<{group}>{pat})")
+                elif pat:
+                    self._add_literal(pat.lower(), 1 << bit)
+        self._build_fail_links()
+        self._regex = re.compile(f"(?=(?:{'|'.join(regex_parts)}))", re.IGNORECASE) if regex_parts else None
+        self._all = (1 << len(self.members)) - 1
+
+    def _add_literal(self, word: str, bits: int):
+        node = 0
+        for ch in word:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(0)
+            node = nxt
+        self._out[node] |= bits
+
+    def _build_fail_links(self):
+        goto, fail, out = self._goto, self._fail, self._out
+        queue = list(goto[0].values())
+        for node in queue:
+            for ch, nxt in goto[node].items():
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] |= out[fail[nxt]]
+                queue.append(nxt)
+
+    def match_bits(self, title: str) -> int:
+        """Bitmask of matched members (bit i = ``self.members[i]``)."""
+        found = 0
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for ch in title.lower():
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found |= out[node]
+                if found == self._all:
+                    return found
+        if self._regex is not None:
+            for m in self._regex.finditer(title):
+                found |= self._group_member[m.lastgroup]
+                if found == self._all:
+                    break
+        return found
+
+    def match(self, title: str) -> list[str]:
+        if not title:
+            return ["GROUP/UNKNOWN"]
+        bits = self.match_bits(title)
+        found = [m for i, m in enumerate(self.members) if bits >> i & 1]
+        return found if found else ["GROUP/UNKNOWN"]
+
+    def match_many(self, titles) -> list[list[str]]:
+        """Tag a whole title column; repeated titles are matched once."""
+        seen = {}
+        result = []
+        for title in titles:
+            members = seen.get(title)
+            if members is None:
+                members = seen[title] = self.match(title)
+            result.append(list(members))
+        return result
+
+
+_matcher = [None]
+
+
+def member_matcher() -> MemberMatcher:
+    """Shared matcher for ``MEMBER_PATTERNS``, built on first use."""
+    if _matcher[0] is None:
+        _matcher[0] = MemberMatcher()
+    return _matcher[0]
+
+
+def pattern_fingerprint(patterns: dict | None = None) -> str:
+    """Stable hash of a member pattern set (member order included)."""
+    patterns = MEMBER_PATTERNS if patterns is None else patterns
+    blob = json.dumps(list(patterns.items()), ensure_ascii=False)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+def _title_key(title: str) -> bytes:
+    return hashlib.blake2b(title.encode("utf-8"), digest_size=12).digest()
+
+
+class TagCache:
+    """On-disk title -> member tags cache (sqlite3).
+
+    Rows map a title hash to the matcher's member bitmask. The pattern
+    fingerprint is stored alongside; when ``MEMBER_PATTERNS`` changes the
+    cached tags are dropped on open, so edited aliases never serve stale tags.
+    """
+
+    BATCH = 500
+
+    def __init__(self, path: Path | None = None, patterns: dict | None = None):
+        self.path = path or BASE_DIR / CACHE_DIRNAME / "member_tags.sqlite"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.matcher = member_matcher() if patterns is None else MemberMatcher(patterns)
+        self.fingerprint = pattern_fingerprint(patterns)
+        self.hits = 0
+        self.misses = 0
+        self.db = sqlite3.connect(self.path)
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS tags (title_hash BLOB PRIMARY KEY, bits INTEGER NOT NULL)")
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+        if row is None or row[0] != self.fingerprint:
+            self.db.execute("DELETE FROM tags")
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('fingerprint', ?)", (self.fingerprint,))
+            self.db.commit()
+
+    def _members(self, bits: int) -> list[str]:
+        found = [m for i, m in enumerate(self.matcher.members) if bits >> i & 1]
+        return found if found else ["GROUP/UNKNOWN"]
+
+    def tag_many(self, titles) -> list[list[str]]:
+        """Member lists for a title column; only unseen titles are matched."""
+        titles = [t or "" for t in titles]
+        keys = [_title_key(t) for t in titles]
+        known = {}
+        unique = list(dict.fromkeys(keys))
+        for lo in range(0, len(unique), self.BATCH):
+            chunk = unique[lo:lo + self.BATCH]
+            marks = ",".join("?" * len(chunk))
+            known.update(self.db.execute(f"SELECT title_hash, bits FROM tags WHERE title_hash IN ({marks})", chunk))
+
+        new_rows = []
+        result = []
+        for title, key in zip(titles, keys):
+            bits = known.get(key)
+            if bits is None:
+                bits = known[key] = self.matcher.match_bits(title)
+                new_rows.append((key, bits))
+                self.misses += 1
+            else:
+                self.hits += 1
+            result.append(self._members(bits))
+        if new_rows:
+            self.db.executemany("INSERT OR REPLACE INTO tags VALUES (?, ?)", new_rows)
+            self.db.commit()
+        return result
 
+    def close(self):
+        self.db.close()
 
-def parse_douyin_likes(val) -> int:
-    if isinstance(val, (int, float)):
-        return int(val)
-    if isinstance(val, str):
-        clean = val.replace(",", "").strip()
-        try:
-            if "万" in clean:
-                return int(float(clean.replace("万", "")) * 10000)
-            elif "K" in clean.upper():
-                return int(float(re.sub(r"[Kk]", "", clean)) * 1000)
-            elif "M" in clean.upper():
-                return int(float(re.sub(r"[Mm]", "", clean)) * 1_000_000)
-            return int(float(clean))
-        except (ValueError, TypeError):
-            return 0
-    return 0
 
+def _tag_rows(table: "VideoTable", rows: list, tagger: TagCache):
+    """Tag the given rows from their titles, keeping every other row's members."""
+    if not rows:
+        return
+    members = [table.members_at(i) for i in range(len(table))]
+    for i, tags in zip(rows, tagger.tag_many(table.titles[i] for i in rows)):
+        members[i] = tags
+    table.set_members(members)
+
+
+# ─── Columnar Video Store ───────────────────────────────────────────────────
+
+
+MAX_MEMBERS = 64  # member bitmasks are stored as unsigned 64-bit ints
+
+PLATFORM_METRICS = {
+    "tiktok": ("views_num", "likes", "comments", "shares"),
+    "youtube": ("views_num", "likes", "comments", "shares"),
+    "douyin": ("likes", "comments", "favorites", "shares", "plays"),
+}
+
+
+def month_ordinal(month: str | None) -> int:
+    """'YYYY-MM' -> year * 12 + (month - 1); -1 when unknown."""
+    if not month:
+        return -1
+    try:
+        return int(month[:4]) * 12 + int(month[5:7]) - 1
+    except ValueError:
+        return -1
+
+
+def ordinal_month(ordinal: int) -> str | None:
+    if ordinal < 0:
+        return None
+    return f"{ordinal // 12:04d}-{ordinal % 12 + 1:02d}"
+
+
+# URL each platform derives from a video id; ``Video`` stores only URLs that differ
+PLATFORM_URLS = {
+    "tiktok": "https://www.tiktok.com/@ive.official/video/{id}",
+    "youtube": "https://www.youtube.com/shorts/{id}",
+    "douyin": "https://www.douyin.com/video/{id}",
+}
+_URL_PARTS = {p: tuple(t.split("{id}")) for p, t in PLATFORM_URLS.items()}
+VIDEO_METRICS = ("views_num", "likes", "comments", "favorites", "shares", "plays")
+_EPOCH_ORDINAL = 719163  # datetime(1970, 1, 1).toordinal()
 
-def load_data() -> dict:
-    # TikTok + YouTube from ive_all_stats.json
-    with open(BASE_DIR / "ive_all_stats.json", "r", encoding="utf-8") as f:
-        all_stats = json.load(f)
-
-    # Parse TikTok
-    tiktok = []
-    for v in all_stats.get("tiktok", []):
-        entry = {
-            "id": v["id"],
-            "url": v.get("url", ""),
-            "title": v.get("title", ""),
-            "members": v.get("members", ["GROUP/UNKNOWN"]),
-            "views_num": parse_views(v.get("views", "")),
-            "views_str": v.get("views", ""),
-            "likes": v.get("likes"),
-            "comments": v.get("comments"),
-            "shares": v.get("shares"),
-            "platform": "tiktok",
-        }
-        dt = tiktok_id_to_date(v["id"])
-        entry["date"] = dt.strftime("%Y-%m-%d") if dt else None
-        entry["month"] = dt.strftime("%Y-%m") if dt else None
-        tiktok.append(entry)
-
-    # Parse YouTube
-    youtube = []
-    for v in all_stats.get("youtube", []):
-        youtube.append({
-            "id": v["id"],
-            "url": v.get("url", ""),
-            "title": v.get("title", ""),
-            "members": v.get("members", ["GROUP/UNKNOWN"]),
-            "views_num": parse_views(v.get("views", "")),
-            "views_str": v.get("views", ""),
-            "likes": v.get("likes"),
-            "comments": v.get("comments"),
-            "shares": v.get("shares"),
-            "platform": "youtube",
-            "date": v.get("upload_date"),
-            "month": v["upload_date"][:7] if v.get("upload_date") else None,
-        })
 
-    # Douyin — merge all sources
-    douyin_by_id = {}
-
-    # Source 1: douyin_full_stats.json (API batch results, most complete)
-    douyin_full = BASE_DIR / "douyin_full_stats.json"
-    if douyin_full.exists():
-        with open(douyin_full, "r", encoding="utf-8") as f:
-            for v in json.load(f):
-                vid = str(v["id"])
-                dt = None
-                if v.get("createTime"):
-                    try:
-                        dt = datetime.fromtimestamp(v["createTime"])
-                    except (OSError, ValueError):
-                        pass
-                douyin_by_id[vid] = {
-                    "id": vid,
-                    "url": f"https://www.douyin.com/video/{vid}",
-                    "title": v.get("desc", ""),
-                    "likes": parse_douyin_likes(v.get("likes", 0)),
-                    "comments": parse_douyin_likes(v.get("comments", 0)),
-                    "favorites": parse_douyin_likes(v.get("favorites", 0)),
-                    "shares": parse_douyin_likes(v.get("shares", 0)),
-                    "plays": parse_douyin_likes(v.get("plays", 0)),
-                    "date": dt.strftime("%Y-%m-%d") if dt else None,
-                    "month": dt.strftime("%Y-%m") if dt else None,
-                    "platform": "douyin",
-                }
-
-    # Source 2: douyin_stats.json (browser-scraped, 18 videos with engagement)
-    douyin_browser = BASE_DIR / "douyin_stats.json"
-    if douyin_browser.exists():
-        with open(douyin_browser, "r", encoding="utf-8") as f:
-            for v in json.load(f):
-                vid = str(v.get("video_id", ""))
-                if vid and vid not in douyin_by_id:
-                    douyin_by_id[vid] = {
-                        "id": vid,
-                        "url": v.get("url", f"https://www.douyin.com/video/{vid}"),
-                        "title": v.get("title", ""),
-                        "likes": parse_douyin_likes(v.get("likes", 0)),
-                        "comments": parse_douyin_likes(v.get("comments", 0)),
-                        "favorites": parse_douyin_likes(v.get("favorites", 0)),
-                        "shares": parse_douyin_likes(v.get("shares", 0)),
-                        "plays": 0,
-                        "date": None,
-                        "month": None,
-                        "platform": "douyin",
-                    }
-
-    # Detect members for Douyin
-    douyin = []
-    for v in douyin_by_id.values():
-        v["members"] = detect_members(v["title"])
-        douyin.append(v)
+def date_timestamp(date: str | None) -> int | None:
+    """'YYYY-MM-DD' -> unix seconds at UTC midnight; None when unknown."""
+    if not date:
+        return None
+    try:
+        return (datetime.fromisoformat(date[:10]).toordinal() - _EPOCH_ORDINAL) * 86400
+    except ValueError:
+        return None
+
+
+class Video:
+    """One normalized video as a slotted record.
+
+    Metrics are ints (None when missing) and ``timestamp`` is the upload day
+    in unix seconds; ``date``, ``month`` and ``url`` are derived on access.
+    ``get`` / ``[]`` keep dict-style consumers working, so a ``Video`` can
+    go anywhere a normalized entry dict does (``VideoTable.append``,
+    ``VideoTable.from_rows``, the report helpers).
+    """
+
+    __slots__ = ("id", "platform", "title", "members", "timestamp", "_url") + VIDEO_METRICS
+
+    def __init__(self, id: str, platform: str, title: str = "", members=None, timestamp: int | None = None,
+                 url: str = "", views_num=None, likes=None, comments=None, favorites=None, shares=None, plays=None):
+        self.id = id
+        self.platform = platform
+        self.title = title
+        self.members = members if members is not None else ["GROUP/UNKNOWN"]
+        self.timestamp = timestamp
+        parts = _URL_PARTS.get(platform)
+        self._url = None if parts and url == parts[0] + id + parts[1] else url
+        self.views_num = views_num
+        self.likes = likes
+        self.comments = comments
+        self.favorites = favorites
+        self.shares = shares
+        self.plays = plays
+
+    @classmethod
+    def from_entry(cls, entry: dict) -> "Video":
+        """From a normalized entry dict (the ``load_data`` shape)."""
+        return cls(entry["id"], entry.get("platform", ""), entry.get("title", ""), entry.get("members"),
+                   date_timestamp(entry.get("date")), entry.get("url", ""),
+                   **{k: entry.get(k) for k in VIDEO_METRICS})
+
+    @property
+    def url(self) -> str:
+        if self._url is None:
+            return PLATFORM_URLS[self.platform].format(id=self.id)
+        return self._url
+
+    @property
+    def date(self) -> str | None:
+        if self.timestamp is None:
+            return None
+        return datetime.fromordinal(self.timestamp // 86400 + _EPOCH_ORDINAL).date().isoformat()
+
+    @property
+    def month(self) -> str | None:
+        date = self.date
+        return date[:7] if date else None
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default) if key in self._FIELDS else default
+
+    def __getitem__(self, key: str):
+        if key not in self._FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._FIELDS
+
+    def to_dict(self) -> dict:
+        return {k: getattr(self, k) for k in self._FIELDS}
+
+    def __repr__(self):
+        return f"Video({self.platform}:{self.id})"
+
+
+Video._FIELDS = frozenset(("id", "platform", "title", "members", "timestamp", "url", "date", "month") + VIDEO_METRICS)
+
+
+class VideoTable:
+    """Column-oriented store for one platform's videos.
+
+    Metrics live in ``array('q')`` columns with a parallel missing-value mask,
+    members are integer codes into ``member_names`` (plus a per-row bitmask
+    of those codes) and months are ordinals (see ``month_ordinal``).
+    ``videos()`` rebuilds per-video ``Video`` records for output code that
+    wants them (``rows()`` the older dict view).
+    """
+
+    def __init__(self, platform: str, metrics: tuple | None = None, member_names: list | None = None):
+        self.platform = platform
+        self.metrics = tuple(metrics or PLATFORM_METRICS[platform])
+        self.member_names = list(member_names or MEMBERS_ORDER)
+        self._member_code = {m: i for i, m in enumerate(self.member_names)}
+        self.ids = []
+        self.titles = []
+        self.urls = []
+        self.dates = []
+        self.views_str = [] if "views_num" in self.metrics else None
+        self.columns = {k: array("q") for k in self.metrics}
+        self.missing = {k: bytearray() for k in self.metrics}
+        self.member_offsets = array("q", [0])
+        self.member_codes = array("H")
+        self.member_masks = array("Q")
+        self.months = array("i")
+        self._index = None
+        self._buckets = {}
+        self._member_tuples = {}
+        self._mapped = False
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _changed(self):
+        self._own()
+        self._index = None
+        self._buckets.clear()
+
+    def _owned_columns(self) -> dict:
+        """Every column as a mutable array / bytearray / list (copies of mapped views)."""
+        def own(col, typecode):
+            if isinstance(col, memoryview):
+                out = array(typecode)
+                out.frombytes(col.cast("B"))
+                return out
+            return col
+
+        out = {name: list(getattr(self, name)) if isinstance(getattr(self, name), SnapshotStrings)
+               else getattr(self, name) for name in ("ids", "titles", "urls", "dates", "views_str")}
+        out["columns"] = {k: own(c, "q") for k, c in self.columns.items()}
+        out["missing"] = {k: bytearray(m) if isinstance(m, memoryview) else m for k, m in self.missing.items()}
+        out["member_offsets"] = own(self.member_offsets, "q")
+        out["member_codes"] = own(self.member_codes, "H")
+        out["member_masks"] = own(self.member_masks, "Q")
+        out["months"] = own(self.months, "i")
+        return out
+
+    def _own(self):
+        """Copy snapshot-backed columns before the first write (see ``Snapshot.table``)."""
+        if self._mapped:
+            self.__dict__.update(self._owned_columns())
+            self._mapped = False
+
+    def __getstate__(self):
+        # Mapped views do not pickle; process workers get owned copies
+        state = dict(self.__dict__)
+        if self._mapped:
+            state.update(self._owned_columns(), _mapped=False)
+        return state
+
+    def member_code(self, member: str) -> int:
+        code = self._member_code.get(member)
+        if code is None:
+            code = len(self.member_names)
+            if code >= MAX_MEMBERS:
+                raise ValueError(f"{self.platform}: more than {MAX_MEMBERS} distinct members")
+            self.member_names.append(member)
+            self._member_code[member] = code
+        return code
+
+    def member_bits(self, members) -> int:
+        """Bitmask with one bit per member code."""
+        mask = 0
+        for m in members:
+            mask |= 1 << self.member_code(m)
+        return mask
+
+    def _append_members(self, members):
+        codes = [self.member_code(m) for m in members]
+        self.member_codes.extend(codes)
+        self.member_offsets.append(len(self.member_codes))
+        mask = 0
+        for c in codes:
+            mask |= 1 << c
+        self.member_masks.append(mask)
+
+    def append(self, entry: dict):
+        """Add one normalized video (the dict shape produced by ``load_data``)."""
+        self.extend({k: [v] for k, v in entry.items()})
+
+    def extend(self, cols: dict, rows=None):
+        """Add a chunk of normalized videos given as columns (see ``SourceAdapter.columns``).
+
+        ``rows`` picks positions of the chunk (default: all of them). Absent
+        keys get ``append``'s defaults; a None member list is GROUP/UNKNOWN.
+        """
+        n = len(cols["id"]) if rows is None else len(rows)
+        if not n:
+            return
+        self._changed()
+
+        def column(key, default):
+            col = cols.get(key)
+            if col is None:
+                return [default] * n
+            return col if rows is None else [col[j] for j in rows]
+
+        self.ids.extend(column("id", ""))
+        self.titles.extend(column("title", ""))
+        self.urls.extend(column("url", ""))
+        self.dates.extend(column("date", None))
+        if self.views_str is not None:
+            self.views_str.extend(column("views_str", ""))
+        for k in self.metrics:
+            vals = column(k, None)
+            if isinstance(vals, array):  # parsed counts are never missing
+                self.columns[k].extend(vals)
+                self.missing[k].extend(bytes(n))
+            else:
+                self.columns[k].extend([int(v) if v is not None else 0 for v in vals])
+                self.missing[k].extend([v is None for v in vals])
+        memo = {}
+        codes, offsets, masks = self.member_codes, self.member_offsets, self.member_masks
+        for members in column("members", None):
+            key = ("GROUP/UNKNOWN",) if members is None else tuple(members)
+            packed = memo.get(key)
+            if packed is None:
+                member_codes = [self.member_code(m) for m in key]
+                mask = 0
+                for c in member_codes:
+                    mask |= 1 << c
+                packed = memo[key] = (member_codes, mask)
+            codes.extend(packed[0])
+            offsets.append(len(codes))
+            masks.append(packed[1])
+        months = column("month", None)
+        ordinals = {m: month_ordinal(m) for m in set(months)}
+        self.months.extend([ordinals[m] for m in months])
+
+    def update(self, i: int, entry: dict):
+        """Overwrite row ``i`` in place with a newer version of the same video."""
+        self._changed()
+        self.titles[i] = entry.get("title", "")
+        self.urls[i] = entry.get("url", "")
+        self.dates[i] = entry.get("date")
+        if self.views_str is not None:
+            self.views_str[i] = entry.get("views_str", "")
+        for k in self.metrics:
+            val = entry.get(k)
+            self.columns[k][i] = int(val) if val is not None else 0
+            self.missing[k][i] = val is None
+        members = entry.get("members", ["GROUP/UNKNOWN"])
+        codes = array("H", (self.member_code(m) for m in members))
+        lo, hi = self.member_offsets[i], self.member_offsets[i + 1]
+        self.member_codes[lo:hi] = codes
+        shift = len(codes) - (hi - lo)
+        if shift:
+            for j in range(i + 1, len(self.member_offsets)):
+                self.member_offsets[j] += shift
+        self.member_masks[i] = self.member_bits(members)
+        self.months[i] = month_ordinal(entry.get("month"))
+
+    def set_members(self, member_lists):
+        """Replace every row's member list (one list per row, in order)."""
+        self._changed()
+        self.member_codes = array("H")
+        self.member_offsets = array("q", [0])
+        self.member_masks = array("Q")
+        for members in member_lists:
+            self._append_members(members)
+
+    def buckets(self, metric_key: str, missing_as_zero: bool = False) -> "BucketIndex":
+        """Shared ``BucketIndex`` for a metric, rebuilt after the table changes."""
+        key = (metric_key, missing_as_zero)
+        index = self._buckets.get(key)
+        if index is None:
+            index = self._buckets[key] = BucketIndex(self, metric_key, missing_as_zero)
+        return index
+
+    # ── Member selections ──
+
+    def member_index(self) -> dict:
+        """Inverted index: member code -> ascending ``array('q')`` of row ids."""
+        if self._index is None:
+            index = {}
+            for i, mask in enumerate(self.member_masks):
+                while mask:
+                    low = mask & -mask
+                    rows = index.get(low.bit_length() - 1)
+                    if rows is None:
+                        rows = index[low.bit_length() - 1] = array("q")
+                    rows.append(i)
+                    mask ^= low
+            self._index = index
+        return self._index
+
+    def rows_with(self, member: str) -> array:
+        """Rows tagged with ``member`` (possibly among others)."""
+        return self.member_index().get(self.member_code(member), array("q"))
+
+    def rows_with_all(self, *members) -> list:
+        """Rows tagged with every one of ``members``."""
+        target = self.member_bits(members)
+        index = self.member_index()
+        candidates = min((index.get(self.member_code(m), ()) for m in members), key=len, default=range(len(self)))
+        masks = self.member_masks
+        return [i for i in candidates if masks[i] & target == target]
+
+    def rows_exactly(self, *members) -> list:
+        """Rows tagged with exactly ``members`` and nobody else."""
+        target = self.member_bits(members)
+        masks = self.member_masks
+        if not members:
+            return [i for i, mask in enumerate(masks) if mask == 0]
+        return [i for i in self.rows_with(members[0]) if masks[i] == target]
+
+    def solo_rows(self) -> list:
+        """Rows with exactly one identified member (not GROUP/UNKNOWN)."""
+        group = self.member_bits(["GROUP/UNKNOWN"])
+        return [i for i, mask in enumerate(self.member_masks) if mask and not mask & (mask - 1) and mask != group]
+
+    def multi_rows(self) -> list:
+        """Rows tagged with two or more members."""
+        return [i for i, mask in enumerate(self.member_masks) if mask & (mask - 1)]
+
+    def codes_at(self, i: int) -> array:
+        return self.member_codes[self.member_offsets[i]:self.member_offsets[i + 1]]
+
+    def iter_member_codes(self):
+        codes, offs = self.member_codes, self.member_offsets
+        for i in range(len(offs) - 1):
+            yield codes[offs[i]:offs[i + 1]]
+
+    def members_at(self, i: int) -> list[str]:
+        names = self.member_names
+        return [names[c] for c in self.codes_at(i)]
+
+    def value(self, i: int, metric_key: str):
+        """Metric value at row ``i``, or None when missing / not tracked."""
+        col = self.columns.get(metric_key)
+        if col is None or self.missing[metric_key][i]:
+            return None
+        return col[i]
+
+    def row(self, i: int) -> dict:
+        v = {
+            "id": self.ids[i],
+            "url": self.urls[i],
+            "title": self.titles[i],
+            "members": self.members_at(i),
+        }
+        for k in self.metrics:
+            v[k] = self.value(i, k)
+        if self.views_str is not None:
+            v["views_str"] = self.views_str[i]
+        v["platform"] = self.platform
+        v["date"] = self.dates[i]
+        v["month"] = ordinal_month(self.months[i])
+        return v
+
+    def rows(self):
+        """Per-video dict view, in table order."""
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def video(self, i: int) -> Video:
+        """Row ``i`` as a ``Video`` record."""
+        return next(self.videos(range(i, i + 1)))
+
+    def videos(self, rows=None):
+        """Per-video ``Video`` records, in table order (or for ``rows``); equal member lists share one tuple."""
+        names, memo = self.member_names, self._member_tuples
+        codes, offs = self.member_codes, self.member_offsets
+        metrics = [(VIDEO_METRICS.index(k), self.columns[k], self.missing[k]) for k in self.metrics]
+        ids, titles, urls, dates, platform = self.ids, self.titles, self.urls, self.dates, self.platform
+        for i in range(len(self)) if rows is None else rows:
+            key = codes[offs[i]:offs[i + 1]].tobytes()
+            members = memo.get(key)
+            if members is None:
+                members = memo[key] = tuple(names[c] for c in codes[offs[i]:offs[i + 1]])
+            values = [None] * len(VIDEO_METRICS)
+            for slot, col, miss in metrics:
+                if not miss[i]:
+                    values[slot] = col[i]
+            yield Video(ids[i], platform, titles[i], members, date_timestamp(dates[i]), urls[i], *values)
+
+    def take(self, indices) -> "VideoTable":
+        """New table holding the given rows, in the given order."""
+        indices = list(indices)
+        out = VideoTable(self.platform, self.metrics, self.member_names)
+        for name in ("ids", "titles", "urls", "dates", "views_str"):
+            col = getattr(self, name)
+            if col is not None:
+                setattr(out, name, [col[i] for i in indices])
+        for k in self.metrics:
+            col, miss = self.columns[k], self.missing[k]
+            out.columns[k] = array("q", [col[i] for i in indices])
+            out.missing[k] = bytearray([miss[i] for i in indices])
+        offsets, codes = self.member_offsets, self.member_codes
+        for i in indices:
+            out.member_codes.extend(codes[offsets[i]:offsets[i + 1]])
+            out.member_offsets.append(len(out.member_codes))
+        masks, months = self.member_masks, self.months
+        out.member_masks = array("Q", [masks[i] for i in indices])
+        out.months = array("i", [months[i] for i in indices])
+        return out
+
+    @classmethod
+    def from_rows(cls, platform: str, rows) -> "VideoTable":
+        table = cls(platform)
+        for v in rows:
+            table.append(v)
+        return table
+
+
+# ─── Streaming JSON ─────────────────────────────────────────────────────────
+
+
+JSON_CHUNK_SIZE = 1 << 16
+_JSON_WS = re.compile(r"[ \t\r\n]*")
+_JSON_NUMBER_TAIL = re.compile(r"[-+.eE0-9]*\Z")  # rest of the buffer may still be part of a number
+
+
+class _JsonStream:
+    """Incremental reader over a JSON text file (stdlib fallback for ijson).
+
+    Only the current chunk plus the value being decoded is buffered, so
+    memory is bounded by the largest single value rather than the file.
+    """
+
+    def __init__(self, f, chunk_size: int = JSON_CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character without consuming it ('' at EOF)."""
+        while True:
+            self.pos = _JSON_WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, ch: str):
+        got = self.peek()
+        if got != ch:
+            raise ValueError(f"{self.f.name}: expected {ch!r}, got {got!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number cut at the buffer edge ("12" of "123", "3." of "3.5", "1e" of "1e+9")
+            # decodes to a shorter one; read on and decode it again
+            if len(self.buf) - end <= 2 and _JSON_NUMBER_TAIL.match(self.buf, end) and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+    def iter_array(self):
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("]")
+            return
+
+    def seek_key(self, key: str) -> bool:
+        """Advance to the value of a top-level object key; False if absent."""
+        self.expect("{")
+        while self.peek() not in ("}", ""):
+            name = self.value()
+            self.expect(":")
+            if name == key:
+                return True
+            if self.peek() == "[":
+                for _ in self.iter_array():
+                    pass
+            else:
+                self.value()
+            if self.peek() == ",":
+                self.pos += 1
+        return False
+
+
+def iter_json_array(path: Path, key: str | None = None):
+    """Yield the elements of a JSON array one at a time.
+
+    ``key`` selects an array under a top-level object (``"tiktok"``); without
+    it the document itself must be an array. Uses ijson when installed,
+    otherwise the stdlib ``_JsonStream`` parser.
+    """
+    if ijson is not None:
+        with open(path, "rb") as f:
+            yield from ijson.items(f, f"{key}.item" if key else "item", use_float=True)
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        stream = _JsonStream(f)
+        if key is not None and not stream.seek_key(key):
+            return
+        if stream.peek() == "[":
+            yield from stream.iter_array()
+        elif stream.value() is not None:
+            raise ValueError(f"{path}: {key or 'document'} is not a JSON array")
+
+
+# ─── Source Adapters ────────────────────────────────────────────────────────
+
+
+def _text(val) -> str:
+    return "" if val is None else val
+
+
+def date_from_tiktok_id(v: dict) -> datetime | None:
+    """TikTok ids carry their upload time in the top 32 bits."""
+    return tiktok_id_to_date(str(v.get("id", "")))
+
+
+def date_from_timestamp(key: str):
+    """Date extractor for a unix-seconds field."""
+    def extract(v: dict) -> datetime | None:
+        if v.get(key):
+            try:
+                return datetime.fromtimestamp(v[key])
+            except (OSError, ValueError):
+                pass
+        return None
+    return extract
+
+
+def date_from_field(key: str):
+    """Date extractor for a field already holding 'YYYY-MM-DD'."""
+    return lambda v: v.get(key)
+
+
+class SourceAdapter:
+    """How one raw scrape file maps onto normalized video entries.
+
+    ``fields`` maps entry keys to ``(record key, converter)``; a None
+    converter copies the value as is. ``defaults`` fill entry keys the
+    source never carries, ``date`` returns a datetime or 'YYYY-MM-DD'
+    string, and ``url`` is a ``{id}`` template for records without one.
+    Records holding ``members_key`` keep their tags; the rest are tagged
+    from their titles when ``tag_titles`` is set, else count as
+    GROUP/UNKNOWN. Among one platform's sources, higher ``priority``
+    wins the merge (see ``merge_sources``).
+    """
+
+    def __init__(self, name: str, platform: str, filename: str, *, key: str | None = None, priority: int = 0,
+                 id_key: str = "id", fields: dict | None = None, defaults: dict | None = None, date=None,
+                 url: str = "", members_key: str | None = None, tag_titles: bool = False):
+        self.name = name
+        self.platform = platform
+        self.filename = filename
+        self.key = key
+        self.priority = priority
+        self.id_key = id_key
+        self.fields = fields or {}
+        self.defaults = defaults or {}
+        self.date = date
+        self.url = url
+        self.members_key = members_key
+        self.tag_titles = tag_titles
+        # Count fields are parsed a column at a time (see ``columns``)
+        self._plain = [(out, src, conv) for out, (src, conv) in self.fields.items() if not isinstance(conv, CountParser)]
+        self._counts = [(out, src, conv) for out, (src, conv) in self.fields.items() if isinstance(conv, CountParser)]
+
+    def records(self, base_dir: Path | None = None):
+        """Raw records, streamed; nothing when the file is absent."""
+        path = (base_dir or BASE_DIR) / self.filename
+        if path.exists():
+            yield from iter_json_array(path, self.key)
+
+    def columns(self, records: list) -> dict:
+        """Normalize a chunk of records into columns, one list per entry key.
+
+        ``members`` holds None for records left to the title tagger.
+        """
+        n = len(records)
+        cols = {"id": ["" if vid is None else str(vid) for vid in (v.get(self.id_key) for v in records)]}
+        for out, src, convert in self._plain:
+            vals = [v.get(src) for v in records]
+            cols[out] = [convert(x) for x in vals] if convert else vals
+        for out, src, parser in self._counts:
+            cols[out] = parser.column([v.get(src) for v in records])
+        for k, val in self.defaults.items():
+            cols.setdefault(k, [val] * n)
+        if self.url:
+            template = self.url
+            cols["url"] = [u or template.format(id=i) for u, i in zip(cols.get("url") or [None] * n, cols["id"])]
+        dates = [self.date(v) for v in records] if self.date else [None] * n
+        dates = [dt.strftime("%Y-%m-%d") if isinstance(dt, datetime) else dt or None for dt in dates]
+        cols["date"], cols["month"] = dates, [dt[:7] if dt else None for dt in dates]
+        fallback = None if self.tag_titles else ["GROUP/UNKNOWN"]
+        key = self.members_key
+        cols["members"] = [v[key] if key and key in v else fallback for v in records]
+        return cols
+
+    def entries(self, records: list) -> list:
+        """Normalize a chunk of records into entry dicts (see ``columns``)."""
+        cols = self.columns(records)
+        entries = []
+        for values in zip(*cols.values()):
+            entry = dict(zip(cols, values))
+            if entry["members"] is None:
+                del entry["members"]
+            entry["platform"] = self.platform
+            entries.append(entry)
+        return entries
+
+    def entry(self, v: dict) -> dict:
+        return self.entries([v])[0]
+
+
+_SHORTS_FIELDS = {
+    "url": ("url", _text),
+    "title": ("title", _text),
+    "views_num": ("views", VIEW_COUNTS),
+    "views_str": ("views", _text),
+    "likes": ("likes", None),
+    "comments": ("comments", None),
+    "shares": ("shares", None),
+}
+_DOUYIN_COUNTS = {k: (k, DOUYIN_COUNTS) for k in ("likes", "comments", "favorites", "shares")}
+
+SOURCE_ADAPTERS = [
+    SourceAdapter("tiktok", "tiktok", "ive_all_stats.json", key="tiktok", fields=_SHORTS_FIELDS,
+                  date=date_from_tiktok_id, members_key="members"),
+    SourceAdapter("youtube", "youtube", "ive_all_stats.json", key="youtube", fields=_SHORTS_FIELDS,
+                  date=date_from_field("upload_date"), members_key="members"),
+    # API batch results: most complete, wins over the browser scrape
+    SourceAdapter("douyin_api", "douyin", "douyin_full_stats.json", priority=10,
+                  fields={"title": ("desc", _text), **_DOUYIN_COUNTS, "plays": ("plays", DOUYIN_COUNTS)},
+                  date=date_from_timestamp("createTime"), url=PLATFORM_URLS["douyin"], tag_titles=True),
+    # Browser scrape: a few videos with engagement, no dates or plays
+    SourceAdapter("douyin_browser", "douyin", "douyin_stats.json", id_key="video_id",
+                  fields={"url": ("url", None), "title": ("title", _text), **_DOUYIN_COUNTS},
+                  defaults={"plays": 0}, url=PLATFORM_URLS["douyin"], tag_titles=True),
+]
+
+ADAPTER_CHUNK = 4096  # records normalized per batch while streaming a source
+
+# Entry key -> how a lower-priority source may change a merged field:
+# "first" (default) only fills a missing value, "max" also raises a smaller one
+MERGE_RULES = {}
+
+
+def platform_adapters(platform: str) -> list:
+    """The platform's adapters, highest priority first."""
+    return sorted((a for a in SOURCE_ADAPTERS if a.platform == platform), key=lambda a: -a.priority)
+
+
+def merge_sources(table: VideoTable, adapters: list, tagger: TagCache, rules: dict | None = None,
+                  base_dir: Path | None = None) -> VideoTable:
+    """Stream the sources of one platform into ``table``, merging records by id.
+
+    Sources are read in priority order a chunk of records at a time, each
+    chunk normalized into columns and its new ids appended in bulk; only
+    the id -> row map is kept. A record from a row's own source replaces
+    it (later duplicates win); one from a lower-priority source only
+    changes fields allowed by ``rules``. Rows left without member tags are
+    tagged from their titles in one batch at the end.
+    """
+    rules = MERGE_RULES if rules is None else rules
+    rows, level_of, untagged = {}, [], set()
+    for level, adapter in enumerate(sorted(adapters, key=lambda a: -a.priority)):
+        records = adapter.records(base_dir)
+        while chunk := list(islice(records, ADAPTER_CHUNK)):
+            cols = adapter.columns(chunk)
+            # New ids are appended in one go; repeats are applied after them, in order
+            fresh, repeats, start = [], [], len(table)
+            for j, vid in enumerate(cols["id"]):
+                if not vid:
+                    continue
+                row = rows.get(vid)
+                if row is None:
+                    rows[vid] = start + len(fresh)
+                    level_of.append(level)
+                    fresh.append(j)
+                else:
+                    repeats.append((j, row))
+            table.extend(cols, fresh)
+            members = cols["members"]
+            untagged.update(start + n for n, j in enumerate(fresh) if members[j] is None)
+            for j, row in repeats:
+                entry = {k: col[j] for k, col in cols.items()}
+                if entry["members"] is None:
+                    del entry["members"]
+                if level_of[row] == level:
+                    table.update(row, entry)
+                    if "members" in entry:
+                        untagged.discard(row)
+                    else:
+                        untagged.add(row)
+                    continue
+                merged, changed = table.row(row), False
+                for k, val in entry.items():
+                    cur = merged.get(k)
+                    if val is not None and (cur is None or rules.get(k) == "max" and val > cur):
+                        merged[k], changed = val, True
+                if changed:
+                    table.update(row, merged)
+    _tag_rows(table, sorted(untagged), tagger)
+    return table
+
+
+def load_data(base_dir: Path | None = None) -> dict:
+    """Every platform's videos from its raw scrape files (``SOURCE_ADAPTERS``).
+
+    Each source is streamed through its adapter; new platforms need an
+    adapter here and their metric columns in ``PLATFORM_METRICS``.
+    """
+    # Parser counts and caches are per load, not per process
+    for parser in (VIEW_COUNTS, DOUYIN_COUNTS):
+        parser.reset()
+    tagger = TagCache(base_dir / CACHE_DIRNAME / "member_tags.sqlite" if base_dir else None)
+    data = {p: merge_sources(VideoTable(p), platform_adapters(p), tagger, base_dir=base_dir) for p in PLATFORM_METRICS}
+    tagger.close()
 
     # Sort douyin by likes descending
-    douyin.sort(key=lambda x: x["likes"], reverse=True)
+    douyin = data["douyin"]
+    likes = douyin.columns["likes"]
+    data["douyin"] = douyin.take(sorted(range(len(douyin)), key=likes.__getitem__, reverse=True))
+
+    print(f"Loaded: TikTok={len(data['tiktok'])}, YouTube={len(data['youtube'])}, Douyin={len(data['douyin'])}")
+    print(f"Member tags: {tagger.hits} cached, {tagger.misses} matched")
+    for parser in (VIEW_COUNTS, DOUYIN_COUNTS):
+        if parser.unparsable:
+            print(f"Unparsable {parser.name} counts (read as 0): {parser.unparsable}, "
+                  f"e.g. {', '.join(map(repr, parser.samples))}")
+    return data
+
+
+FULL_DATA_CSV = "ive_full_video_data.csv"
+
+# Full-data CSV column -> metric key; empty cells are missing values
+CSV_METRICS = {"Views": "views_num", "Likes": "likes", "Comments": "comments",
+               "Favorites": "favorites", "Shares": "shares"}
+
+
+def split_members(cell: str) -> list[str]:
+    """Inverse of the '/'-joined Members column (GROUP/UNKNOWN contains the separator)."""
+    out = []
+    for part in cell.split("/"):
+        if part == "UNKNOWN" and out and out[-1] == "GROUP":
+            out[-1] = "GROUP/UNKNOWN"
+        elif part:
+            out.append(part)
+    return out
+
+
+def load_data_csv(path: Path | None = None) -> dict:
+    """Rebuild the loaded tables from the published full-data CSV.
+
+    Rows keep their file order (Douyin is already sorted by likes) and their
+    member tags; months come from the Date column. Fields the CSV does not
+    carry (Douyin plays, the raw views string) are left missing.
+    """
+    path = path or BASE_DIR / FULL_DATA_CSV
+    tables = {p: VideoTable(p) for p in PLATFORM_METRICS}
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        col = {name: i for i, name in enumerate(next(reader))}
+        i_platform, i_id, i_title, i_members, i_views, i_date, i_url = (
+            col[n] for n in ("Platform", "ID", "Title", "Members", "Views", "Date", "URL"))
+        # Per platform: (metric key, column index) for the metrics it tracks
+        converters = {p: [(k, col[name]) for name, k in CSV_METRICS.items() if k in t.metrics]
+                      for p, t in tables.items()}
+        member_cache = {}
+        for row in reader:
+            platform = row[i_platform].lower()
+            table = tables[platform]
+            members = member_cache.get(row[i_members])
+            if members is None:
+                members = member_cache[row[i_members]] = split_members(row[i_members])
+            date = row[i_date] or None
+            entry = {
+                "id": row[i_id], "title": row[i_title], "url": row[i_url],
+                "members": members, "date": date, "month": date[:7] if date else None,
+            }
+            for k, i in converters[platform]:
+                cell = row[i]
+                entry[k] = int(cell) if cell else None
+            if table.views_str is not None:
+                entry["views_str"] = row[i_views]
+            table.append(entry)
 
-    print(f"Loaded: TikTok={len(tiktok)}, YouTube={len(youtube)}, Douyin={len(douyin)}")
-    return {"tiktok": tiktok, "youtube": youtube, "douyin": douyin}
+    print(f"Loaded from {path.name}: TikTok={len(tables['tiktok'])}, "
+          f"YouTube={len(tables['youtube'])}, Douyin={len(tables['douyin'])}")
+    return tables
 
 
-# ─── Analysis Functions ─────────────────────────────────────────────────────
+def raw_sources_present() -> bool:
+    """True when the raw scrape JSON that ``load_data`` reads is available."""
+    return (BASE_DIR / "ive_all_stats.json").exists()
 
 
-def compute_member_stats(videos: list, metric_key: str) -> dict:
-    """Compute per-member statistics."""
-    member_videos = defaultdict(list)
-    for v in videos:
-        val = v.get(metric_key)
-        if val is None:
-            continue
-        for m in v.get("members", ["GROUP/UNKNOWN"]):
-            member_videos[m].append(val)
+# ─── Incremental Ingestion ──────────────────────────────────────────────────
 
-    result = {}
-    for member in MEMBERS_ORDER:
-        vals = member_videos.get(member, [])
-        if not vals:
+
+BATCH_PLATFORMS = ("tiktok", "youtube", "douyin")
+
+
+def batch_entries(path: Path, platform: str | None = None) -> dict:
+    """Normalized entries of a scrape batch, per platform.
+
+    A batch is either an object with ``tiktok`` / ``youtube`` / ``douyin``
+    arrays (the ``ive_all_stats.json`` shape) or a bare array of records
+    for ``platform``. Records are normalized like ``load_data`` does and
+    come back as ``(entry, replaces)``: records of a lower-priority source
+    (e.g. the Douyin browser scrape) only fill in videos not known yet.
+    """
+    doc = json.loads(path.read_text(encoding="utf-8"))
+    if isinstance(doc, list):
+        if platform is None:
+            raise ValueError(f"{path}: a bare array batch needs --platform")
+        doc = {platform: doc}
+    elif not isinstance(doc, dict):
+        raise ValueError(f"{path}: expected a JSON object or array")
+    out = {}
+    for p in BATCH_PLATFORMS:
+        records = doc.get(p)
+        if not records:
+            continue
+        adapters = platform_adapters(p)
+        out[p] = []
+        for v in records:
+            # The first adapter whose id field the record has; only the top one replaces rows
+            adapter = next((a for a in adapters if a.id_key in v), adapters[0])
+            out[p].append((adapter.entry(v), adapter is adapters[0]))
+    return out
+
+
+class IdIndex:
+    """Persistent (platform, video id) -> table row index (sqlite3).
+
+    Stores the load key of the tables it indexes; ``sync`` rebuilds it once
+    when that key differs, after which each batch only looks up its own ids.
+    """
+
+    BATCH = 500
+
+    def __init__(self, path: Path | str | None = None):
+        self.path = path or BASE_DIR / CACHE_DIRNAME / "video_ids.sqlite"
+        if isinstance(self.path, Path):  # else ":memory:"
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS ids (platform TEXT NOT NULL, id TEXT NOT NULL, "
+                        "row INTEGER NOT NULL, PRIMARY KEY (platform, id)) WITHOUT ROWID")
+
+    @property
+    def key(self) -> str | None:
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'load_key'").fetchone()
+        return row[0] if row else None
+
+    def set_key(self, key: str):
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('load_key', ?)", (key,))
+
+    def sync(self, data: dict, key: str):
+        """Re-index ``data`` unless the index already belongs to ``key``."""
+        if self.key == key:
+            return
+        with self.db:
+            self.db.execute("DELETE FROM ids")
+            for p in BATCH_PLATFORMS:
+                self.db.executemany("INSERT OR REPLACE INTO ids VALUES (?, ?, ?)",
+                                    ((p, vid, i) for i, vid in enumerate(data[p].ids)))
+        self.set_key(key)
+
+    def lookup(self, platform: str, ids) -> dict:
+        found = {}
+        unique = list(dict.fromkeys(ids))
+        for lo in range(0, len(unique), self.BATCH):
+            chunk = unique[lo:lo + self.BATCH]
+            marks = ",".join("?" * len(chunk))
+            found.update(self.db.execute(
+                f"SELECT id, row FROM ids WHERE platform = ? AND id IN ({marks})", (platform, *chunk)))
+        return found
+
+    def add(self, platform: str, rows):
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO ids VALUES (?, ?, ?)", ((platform, vid, i) for vid, i in rows))
+
+    def close(self):
+        self.db.close()
+
+
+def ingest_batch(data: dict, entries: dict, index: IdIndex, tagger: TagCache) -> list:
+    """Apply a batch in place: new ids are appended, known ids updated.
+
+    Returns ``(platform, row, old, entry)`` per applied entry in order,
+    ``old`` being the row's previous ``Video`` (None for inserts), for delta
+    updates and the snapshot's side log.
+    """
+    changes = []
+    for platform, batch in entries.items():
+        table = data[platform]
+        # Records of title-tagged sources (Douyin) get tags from their titles, as in load_data
+        untagged = [e for e, _ in batch if "members" not in e]
+        for e, tags in zip(untagged, tagger.tag_many(e["title"] for e in untagged)):
+            e["members"] = tags
+        rows = index.lookup(platform, [e["id"] for e, _ in batch])
+        new_rows = []
+        for e, replaces in batch:
+            if not e["id"]:
+                continue
+            row = rows.get(e["id"])
+            if row is None:
+                row = rows[e["id"]] = len(table)
+                table.append(e)
+                new_rows.append((e["id"], row))
+                changes.append((platform, row, None, e))
+            elif replaces:
+                old = table.video(row)
+                table.update(row, e)
+                changes.append((platform, row, old, e))
+        index.add(platform, new_rows)
+    return changes
+
+
+def apply_trend_delta(engines: dict, data: dict, changes: list):
+    """Update trend engines for ingested rows: retract the old version, add the new."""
+    for platform, row, old, _ in changes:
+        engine = engines.get(platform)
+        if engine is None:
             continue
-        sorted_vals = sorted(vals, reverse=True)
-        result[member] = {
-            "count": len(vals),
-            "total": sum(vals),
-            "mean": statistics.mean(vals),
-            "median": statistics.median(vals),
-            "stdev": statistics.stdev(vals) if len(vals) > 1 else 0,
-            "min": min(vals),
-            "max": max(vals),
-            "p25": sorted_vals[int(len(sorted_vals) * 0.75)] if vals else 0,
-            "p75": sorted_vals[int(len(sorted_vals) * 0.25)] if vals else 0,
-            "p90": sorted_vals[int(len(sorted_vals) * 0.10)] if vals else 0,
-            "p99": sorted_vals[int(len(sorted_vals) * 0.01)] if vals else 0,
-            "top5_avg": statistics.mean(sorted_vals[:5]) if len(sorted_vals) >= 5 else statistics.mean(sorted_vals),
+        table = data[platform]
+        if old is not None:
+            engine.remove(old.date, old.members, old.get(engine.metric_key) or 0, month_ordinal(old.month))
+        value = table.value(row, engine.metric_key) or 0
+        engine.add(table.dates[row], table.members_at(row), value, table.months[row])
+
+
+def applied_batches(root: Path | None = None) -> list:
+    """Batches ingested with ``append``, in order: ``[{"name", "hash", "platform"}]``."""
+    root = root or BASE_DIR / CACHE_DIRNAME / "batches"
+    try:
+        return json.loads((root / "applied.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+
+
+def register_batch(path: Path, platform: str | None = None, root: Path | None = None) -> dict:
+    """Keep a copy of ``path`` and add it to the applied list; full reloads replay it."""
+    root = root or BASE_DIR / CACHE_DIRNAME / "batches"
+    root.mkdir(parents=True, exist_ok=True)
+    raw = path.read_bytes()
+    digest = hashlib.sha1(raw).hexdigest()
+    batches = applied_batches(root)
+    if any(b["hash"] == digest for b in batches):
+        raise ValueError(f"{path}: batch already applied")
+    (root / f"{digest}.json").write_bytes(raw)
+    batch = {"name": path.name, "hash": digest, "platform": platform}
+    tmp = root / "applied.json.tmp"
+    tmp.write_text(json.dumps(batches + [batch], indent=2), encoding="utf-8")
+    os.replace(tmp, root / "applied.json")
+    return batch
+
+
+def save_batch_rows(digest: str, snapshot_id: str, changes: list, root: Path | None = None) -> int:
+    """Durably log the rows a batch wrote, on top of snapshot ``snapshot_id``.
+
+    These per-batch logs are the snapshot's side log: ``load_snapshot``
+    re-applies them instead of ``append`` rewriting the whole file. Returns
+    the log's size in bytes.
+    """
+    root = root or BASE_DIR / CACHE_DIRNAME / "batches"
+    root.mkdir(parents=True, exist_ok=True)
+    doc = {"snapshot": snapshot_id, "rows": [[p, row, entry] for p, row, _, entry in changes]}
+    raw = json.dumps(doc, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    tmp = root / f"{digest}.rows.json.tmp"
+    with open(tmp, "wb") as f:
+        f.write(raw)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, root / f"{digest}.rows.json")
+    return len(raw)
+
+
+def apply_batch_rows(data: dict, digest: str, snapshot_id: str, root: Path | None = None) -> bool:
+    """Re-apply a batch's logged rows; False when the log is missing or was
+    written on top of another snapshot."""
+    root = root or BASE_DIR / CACHE_DIRNAME / "batches"
+    try:
+        doc = json.loads((root / f"{digest}.rows.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return False
+    if doc.get("snapshot") != snapshot_id:
+        return False
+    for platform, row, entry in doc["rows"]:
+        table = data[platform]
+        if row == len(table):
+            table.append(entry)
+        else:
+            table.update(row, entry)
+    return True
+
+
+def replay_batches(data: dict, root: Path | None = None):
+    """Re-apply every registered batch on top of freshly loaded tables.
+
+    Appended rows go after the loaded ones in ingestion order (Douyin's
+    likes order only covers the sources), exactly as ``append`` left them.
+    """
+    root = root or BASE_DIR / CACHE_DIRNAME / "batches"
+    batches = applied_batches(root)
+    if not batches:
+        return
+    index, tagger = IdIndex(":memory:"), TagCache()
+    index.sync(data, "")
+    for b in batches:
+        ingest_batch(data, batch_entries(root / f"{b['hash']}.json", b["platform"]), index, tagger)
+    index.close()
+    tagger.close()
+    print(f"Replayed {len(batches)} appended batch(es): TikTok={len(data['tiktok'])}, "
+          f"YouTube={len(data['youtube'])}, Douyin={len(data['douyin'])}")
+
+
+def run_append(args, get_data, cache: "StageCache", old_key: str, batch_key) -> int:
+    """Ingest one batch file into the loaded tables without reloading the sources.
+
+    Known (platform, id) pairs are updated in place, new ones appended. The
+    changed rows go to the snapshot's side log (``save_batch_rows``); the
+    snapshot itself is only rewritten once the side log outgrows
+    ``SNAPSHOT_LOG_RATIO`` of it. The batch is registered after either is on
+    disk, and the cached trend engines, when current, are moved forward by
+    delta so the next analysis skips the trend stages.
+    """
+    start = time.perf_counter()
+    path = Path(args.batch)
+    try:
+        entries = batch_entries(path, args.platform)
+        digest = hashlib.sha1(path.read_bytes()).hexdigest()
+    except (OSError, ValueError) as e:
+        print(f"append: {e}", file=sys.stderr)
+        return 2
+    applied = [b["hash"] for b in applied_batches()]
+    if digest in applied:
+        print(f"append: {path}: batch already applied", file=sys.stderr)
+        return 1
+    data = get_data(with_solo=False)
+    engines = cache.load("trends") if cache.fresh("trends", old_key) else None
+    snapshot_path = BASE_DIR / SNAPSHOT_NAME
+    with Snapshot(snapshot_path) as snap:
+        snapshot_id, included = snap.id, set(snap.batches)
+
+    index, tagger = IdIndex(), TagCache()
+    index.sync(data, old_key)
+    index.set_key("")  # stale until the batch is registered below
+    changes = ingest_batch(data, entries, index, tagger)
+    tagger.close()
+    root = BASE_DIR / CACHE_DIRNAME / "batches"
+    logged = save_batch_rows(digest, snapshot_id, changes, root)
+    logged += sum((root / f"{h}.rows.json").stat().st_size for h in applied if h not in included)
+    if logged > SNAPSHOT_LOG_RATIO * snapshot_path.stat().st_size:
+        save_snapshot(data, snapshot_path, applied + [digest])
+        for h in applied + [digest]:
+            (root / f"{h}.rows.json").unlink(missing_ok=True)
+    batch = register_batch(path, args.platform, root)
+    new_key = batch_key(batch["hash"])
+    cache.done("load", new_key)
+    index.set_key(new_key)
+    index.close()
+    if engines is not None:
+        apply_trend_delta(engines, data, changes)
+        cache.done("trends", new_key, engines)
+
+    added = sum(old is None for _, _, old, _ in changes)
+    print(f"Appended {path.name}: {added} new, {len(changes) - added} updated "
+          f"in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+# ─── Quantile Sketches ──────────────────────────────────────────────────────
+
+
+SKETCH_K = 4096
+
+
+class QuantileSketch:
+    """Mergeable KLL quantile sketch.
+
+    ``levels[h]`` holds items of weight ``2**h``; memory stays around
+    ``3 * k`` items however many values are added. Until the first
+    compaction every value is kept and rank queries are exact. After it,
+    ``rank_error`` is a hard bound on how far an answered rank can be off:
+    compacting level h moves any rank by at most ``2**h``. Sketches for
+    different shards combine with ``merge`` and round-trip through
+    ``to_dict`` / ``from_dict``.
+    """
+
+    __slots__ = ("k", "n", "rank_error", "levels", "_size", "_limit", "_flip", "_view")
+
+    def __init__(self, k: int = SKETCH_K):
+        self.k = k
+        self.n = 0
+        self.rank_error = 0
+        self.levels = [[]]
+        self._flip = 0
+        self._reset()
+
+    def _capacity(self, h: int) -> int:
+        return max(2, int(self.k * (2 / 3) ** (len(self.levels) - 1 - h)))
+
+    def _reset(self):
+        self._size = sum(map(len, self.levels))
+        self._limit = sum(self._capacity(h) for h in range(len(self.levels)))
+        self._view = None
+
+    def add(self, value):
+        self.levels[0].append(value)
+        self.n += 1
+        self._size += 1
+        self._view = None
+        if self._size >= self._limit:
+            self._compress()
+
+    def extend(self, values):
+        """Bulk add; compacts once at the end instead of per value."""
+        level = self.levels[0]
+        before = len(level)
+        level.extend(values)
+        added = len(level) - before
+        self.n += added
+        self._size += added
+        self._view = None
+        if self._size >= self._limit:
+            self._compress()
+
+    def _compress(self):
+        while self._size >= self._limit:
+            h = next(h for h, level in enumerate(self.levels) if len(level) >= self._capacity(h))
+            if h + 1 == len(self.levels):
+                self.levels.append([])
+            level = sorted(self.levels[h])
+            odd = len(level) & 1
+            self._flip ^= 1
+            self.levels[h + 1].extend(level[self._flip:len(level) - odd:2])
+            self.levels[h] = level[len(level) - odd:]
+            self.rank_error += 1 << h
+            self._reset()
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for h, level in enumerate(other.levels):
+            self.levels[h].extend(level)
+        self.n += other.n
+        self.rank_error += other.rank_error
+        self._reset()
+        if self._size >= self._limit:
+            self._compress()
+        return self
+
+    def _sorted(self):
+        if self._view is None:
+            items = sorted((v, 1 << h) for h, level in enumerate(self.levels) for v in level)
+            self._view = ([v for v, _ in items], list(accumulate(w for _, w in items)))
+        return self._view
+
+    def at_rank(self, rank: int):
+        """Value at 0-based ascending rank ``rank``."""
+        values, cum = self._sorted()
+        if not values:
+            raise ValueError("empty sketch")
+        return values[min(bisect_right(cum, rank), len(values) - 1)]
+
+    def quantile(self, q: float):
+        return self.at_rank(min(int(self.n * q), self.n - 1))
+
+    def median(self):
+        """Same convention as ``statistics.median`` (mean of the middle pair)."""
+        mid = self.n // 2
+        if self.n % 2:
+            return self.at_rank(mid)
+        return (self.at_rank(mid - 1) + self.at_rank(mid)) / 2
+
+    def to_dict(self) -> dict:
+        return {"k": self.k, "n": self.n, "rank_error": self.rank_error, "levels": self.levels}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "QuantileSketch":
+        sketch = cls(d["k"])
+        sketch.n = d["n"]
+        sketch.rank_error = d["rank_error"]
+        sketch.levels = [list(level) for level in d["levels"]]
+        sketch._reset()
+        return sketch
+
+
+_STDEV_CONTEXT = decimal.Context(prec=50)
+
+
+def _mean(total: int, n: int):
+    """``statistics.mean`` of ints: an int when exact, else a float."""
+    return total // n if total % n == 0 else total / n
+
+
+class MetricSummary:
+    """Streaming accumulator for one member's values of one metric.
+
+    Counts, sums and extremes are exact; median and percentiles come from a
+    ``QuantileSketch``. ``summary()`` returns the ``_member_summary`` dict.
+    """
+
+    __slots__ = ("count", "total", "sumsq", "min", "max", "top", "sketch")
+
+    def __init__(self, k: int = SKETCH_K):
+        self.count = 0
+        self.total = 0
+        self.sumsq = 0
+        self.min = None
+        self.max = None
+        self.top = []
+        self.sketch = QuantileSketch(k)
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.sumsq += value * value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        if len(self.top) < 5:
+            heapq.heappush(self.top, value)
+        elif value > self.top[0]:
+            heapq.heapreplace(self.top, value)
+        self.sketch.add(value)
+
+    def merge(self, other: "MetricSummary") -> "MetricSummary":
+        self.count += other.count
+        self.total += other.total
+        self.sumsq += other.sumsq
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        self.top = heapq.nlargest(5, self.top + other.top)
+        heapq.heapify(self.top)
+        self.sketch.merge(other.sketch)
+        return self
+
+    def stdev(self) -> float:
+        """Sample standard deviation, correctly rounded like ``statistics.stdev``."""
+        n = self.count
+        if n < 2:
+            return 0
+        ctx = _STDEV_CONTEXT
+        var = ctx.divide(decimal.Decimal(n * self.sumsq - self.total * self.total), decimal.Decimal(n * (n - 1)))
+        return float(ctx.sqrt(var))
+
+    def summary(self) -> dict:
+        n, sk = self.count, self.sketch
+        # pNN is read from the descending order at index int(n * (1 - NN/100))
+        return {
+            "count": n,
+            "total": self.total,
+            "mean": _mean(self.total, n),
+            "median": sk.median(),
+            "stdev": self.stdev(),
+            "min": self.min,
+            "max": self.max,
+            "p25": sk.at_rank(n - 1 - int(n * 0.75)),
+            "p75": sk.at_rank(n - 1 - int(n * 0.25)),
+            "p90": sk.at_rank(n - 1 - int(n * 0.10)),
+            "p99": sk.at_rank(n - 1 - int(n * 0.01)),
+            "top5_avg": _mean(sum(self.top), len(self.top)),
         }
+
+
+# ─── Bucketing ──────────────────────────────────────────────────────────────
+
+
+def linear_edges(cap: float, bins: int) -> list:
+    """``bins + 1`` evenly spaced integer edges from 0 to ``cap``."""
+    width = cap / bins
+    return [round(i * width) for i in range(bins + 1)]
+
+
+def log_edges(lo: float, hi: float, bins: int) -> list:
+    """``bins + 1`` log-spaced integer edges from ``lo`` (> 0) to ``hi``."""
+    ratio = (hi / lo) ** (1 / bins)
+    return [round(lo * ratio ** i) for i in range(bins + 1)]
+
+
+class BucketIndex:
+    """One metric of a ``VideoTable``, sorted per member for bucket counting.
+
+    Built in one pass over the table. After that every histogram bin, tier
+    and threshold count is answered with bisects, O(log n) per cut point
+    however many buckets are asked for. Rows with a missing value are left
+    out unless ``missing_as_zero`` (the tier table counts them as 0).
+    """
+
+    def __init__(self, table: "VideoTable", metric_key: str, missing_as_zero: bool = False):
+        self.table = table
+        col = table.columns[metric_key]
+        miss = table.missing[metric_key]
+        member_rows = {}
+        for c, rows in table.member_index().items():
+            member_rows[c] = rows if missing_as_zero else [i for i in rows if not miss[i]]
+        # Ascending by value; ties in reverse table order so reversing gives
+        # the stable descending order used for top-N lists
+        self._rows = {c: sorted(rows, key=lambda i: (col[i], -i)) for c, rows in member_rows.items()}
+        self._values = {c: [col[i] for i in rows] for c, rows in self._rows.items()}
+        self.all_values = sorted(v for v, gone in zip(col, miss) if missing_as_zero or not gone)
+
+    def values(self, member: str) -> list:
+        """Member's values, ascending."""
+        return self._values.get(self.table.member_code(member), [])
+
+    def total(self, member: str) -> int:
+        return len(self.values(member))
+
+    def count_below(self, member: str, x: float) -> int:
+        return bisect_left(self.values(member), x)
+
+    def hit_counts(self, member: str, thresholds) -> list:
+        """Videos at or above each threshold."""
+        vals = self.values(member)
+        return [len(vals) - bisect_left(vals, t) for t in thresholds]
+
+    def tier_counts(self, member: str, tiers) -> list:
+        """Videos in each ``(label, lo, hi)`` tier, ``lo <= value < hi``."""
+        vals = self.values(member)
+        return [bisect_left(vals, hi) - bisect_left(vals, lo) for _, lo, hi in tiers]
+
+    def histogram(self, member: str, edges) -> list:
+        """Counts for the ``len(edges) - 1`` bins between ``edges``.
+
+        Values below the first edge fall in the first bin and values at or
+        past the last inner edge fall in the last bin.
+        """
+        vals = self.values(member)
+        below = [bisect_left(vals, e) for e in edges[1:-1]]
+        return [hi - lo for lo, hi in zip([0] + below, below + [len(vals)])]
+
+    def top_rows(self, member: str, n: int) -> list:
+        """Row indices of the member's ``n`` highest values, highest first."""
+        rows = self._rows.get(self.table.member_code(member), [])
+        return rows[:-n - 1:-1] if n else []
+
+    def positive_percentile(self, q: float):
+        """Value at fraction ``q`` of the positive values over all rows (None if none)."""
+        start = bisect_right(self.all_values, 0)
+        n = len(self.all_values) - start
+        if n == 0:
+            return None
+        return self.all_values[start + min(int(n * q), n - 1)]
+
+
+# ─── Analysis Functions ─────────────────────────────────────────────────────
+
+
+TT_THRESHOLDS = [5_000_000, 10_000_000, 20_000_000]
+YT_THRESHOLDS = [2_000_000, 5_000_000, 10_000_000]
+DY_THRESHOLDS = [200_000, 500_000, 1_000_000]
+
+
+def _member_summary(vals: list) -> dict:
+    acc = MetricSummary()
+    for v in vals:
+        acc.add(v)
+    return acc.summary()
+
+
+def compute_platform_stats(table: VideoTable, metrics=None) -> dict:
+    """Per-member statistics for every metric, walking each member's rows once.
+
+    Rows come from the table's inverted member index, and the "all" and
+    "solo" (exactly one identified member) variants are filled from the
+    same walk. Returns ``{"all": {metric: rankings}, "solo": {...},
+    "sketches": {"all": {metric: {member: QuantileSketch}}, "solo": {...}}}``
+    where each rankings dict has the ``compute_member_stats`` shape.
+    """
+    metrics = [k for k in (metrics or table.metrics) if k in table.columns]
+    group = table.member_code("GROUP/UNKNOWN")
+    masks = table.member_masks
+    accs = [(table.columns[k], table.missing[k], {}, {}) for k in metrics]
+
+    # Walk each member's rows from the inverted index; a row is solo for
+    # that member when its bitmask is exactly the member's bit
+    for c, rows in table.member_index().items():
+        bit = 1 << c if c != group else -1
+        for col, miss, all_accs, solo_accs in accs:
+            all_acc = all_accs[c] = MetricSummary()
+            solo_acc = None
+            for i in rows:
+                if miss[i]:
+                    continue
+                val = col[i]
+                all_acc.add(val)
+                if masks[i] == bit:
+                    if solo_acc is None:
+                        solo_acc = solo_accs[c] = MetricSummary()
+                    solo_acc.add(val)
+
+    result = {"all": {}, "solo": {}, "sketches": {"all": {}, "solo": {}}}
+    for k, (_, _, all_accs, solo_accs) in zip(metrics, accs):
+        for variant, member_accs in (("all", all_accs), ("solo", solo_accs)):
+            rankings = {}
+            sketches = {}
+            for member in MEMBERS_ORDER:
+                acc = member_accs.get(table.member_code(member))
+                if acc is not None and acc.count:
+                    rankings[member] = acc.summary()
+                    sketches[member] = acc.sketch
+            result[variant][k] = rankings
+            result["sketches"][variant][k] = sketches
     return result
 
 
-def compute_viral_analysis(videos: list, metric_key: str, thresholds: list) -> dict:
+def compute_member_stats(table: VideoTable, metric_key: str) -> dict:
+    """Compute per-member statistics."""
+    return compute_platform_stats(table, [metric_key])["all"].get(metric_key, {})
+
+
+def _video_ref(table: VideoTable, i: int, value) -> dict:
+    return {
+        "id": table.ids[i],
+        "title": table.titles[i][:80],
+        "value": value,
+        "url": table.urls[i],
+    }
+
+
+def compute_viral_analysis(table: VideoTable, metric_key: str, thresholds: list) -> dict:
     """Compute viral hit rates and top videos per member."""
-    member_videos = defaultdict(list)
-    for v in videos:
-        val = v.get(metric_key)
-        if val is None:
-            continue
-        for m in v.get("members", ["GROUP/UNKNOWN"]):
-            member_videos[m].append({"value": val, "video": v})
+    col = table.columns.get(metric_key)
+    buckets = table.buckets(metric_key) if col is not None else None
 
     result = {"thresholds": thresholds, "hit_rates": {}, "top_videos": {}}
 
     for member in MEMBERS_ORDER:
-        entries = member_videos.get(member, [])
-        if not entries:
+        total = buckets.total(member) if buckets is not None else 0
+        if not total:
             continue
-        total = len(entries)
 
         # Hit rates at each threshold
         rates = []
-        for t in thresholds:
-            above = sum(1 for e in entries if e["value"] >= t)
-            rates.append({"threshold": t, "count": above, "rate": above / total if total else 0})
+        for t, above in zip(thresholds, buckets.hit_counts(member, thresholds)):
+            rates.append({"threshold": t, "count": above, "rate": above / total})
         result["hit_rates"][member] = rates
 
         # Top 10 videos
-        sorted_entries = sorted(entries, key=lambda x: -x["value"])
-        result["top_videos"][member] = [
-            {
-                "id": e["video"]["id"],
-                "title": e["video"].get("title", "")[:80],
-                "value": e["value"],
-                "url": e["video"].get("url", ""),
-            }
-            for e in sorted_entries[:10]
-        ]
+        result["top_videos"][member] = [_video_ref(table, i, col[i]) for i in buckets.top_rows(member, 10)]
 
     # Overall top 20
-    all_sorted = sorted(videos, key=lambda x: -x.get(metric_key, 0))
+    values = col if col is not None else [0] * len(table)
+    all_sorted = sorted(range(len(table)), key=lambda i: -values[i])
     result["overall_top20"] = [
         {
-            "id": v["id"],
-            "title": v.get("title", "")[:80],
-            "value": v.get(metric_key, 0),
-            "members": v.get("members", []),
-            "url": v.get("url", ""),
+            "id": table.ids[i],
+            "title": table.titles[i][:80],
+            "value": values[i],
+            "members": table.members_at(i),
+            "url": table.urls[i],
         }
-        for v in all_sorted[:20]
+        for i in all_sorted[:20]
     ]
 
     return result
 
 
-def compute_time_trends(videos: list, metric_key: str) -> dict:
-    """Compute monthly trends per member."""
-    monthly = defaultdict(lambda: defaultdict(list))
+TREND_GRANULARITIES = ("day", "week", "month", "quarter")
+DEFAULT_TREND_GRANULARITIES = ("month",)  # what the reports show; others via --granularities
+TREND_METRICS = {"tiktok": "views_num", "youtube": "views_num", "douyin": "likes"}
 
-    for v in videos:
-        month = v.get("month")
-        if not month:
-            continue
-        val = v.get(metric_key, 0)
-        for m in v.get("members", ["GROUP/UNKNOWN"]):
-            monthly[month][m].append(val)
 
-    # Build sorted month list
-    months = sorted(monthly.keys())
+def trend_buckets(date: str | None, month: int = -1) -> tuple:
+    """(day, ISO week, month, quarter) bucket labels for a video.
 
-    # Build per-member trends
-    trends = {}
-    for member in MEMBERS_ORDER:
-        series = []
-        for month in months:
-            vals = monthly[month].get(member, [])
-            series.append({
-                "month": month,
-                "count": len(vals),
-                "total": sum(vals),
-                "avg": statistics.mean(vals) if vals else 0,
-            })
-        if any(s["count"] > 0 for s in series):
-            trends[member] = series
+    ``2025-01-31``, ``2025-W05``, ``2025-01``, ``2025-Q1``; without a date
+    only the month (from the month ordinal) is known.
+    """
+    if date:
+        try:
+            d = datetime.strptime(date[:10], "%Y-%m-%d")
+        except ValueError:
+            d = None
+        if d is not None:
+            iso_year, iso_week, _ = d.isocalendar()
+            return (f"{d:%Y-%m-%d}", f"{iso_year:04d}-W{iso_week:02d}", f"{d:%Y-%m}",
+                    f"{d.year:04d}-Q{(d.month - 1) // 3 + 1}")
+    m = ordinal_month(month)
+    if m is None:
+        return (None, None, None, None)
+    return (None, None, m, f"{m[:4]}-Q{(int(m[5:7]) - 1) // 3 + 1}")
+
+
+class TrendCell:
+    """Running count / total for one (bucket, member)."""
+
+    __slots__ = ("count", "total")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+
+
+class TrendEngine:
+    """Per-member trends of one metric at several time granularities.
+
+    Keeps a ``TrendCell`` per (granularity, bucket, member) and nothing
+    else, so new videos are folded in with ``add`` / ``extend`` without
+    touching history, and ``series`` reads any granularity back in the
+    ``compute_time_trends`` shape. Missing metric values count as 0 and
+    videos with no known date/month are skipped, as before.
+    """
+
+    def __init__(self, metric_key: str, granularities=DEFAULT_TREND_GRANULARITIES):
+        self.metric_key = metric_key
+        self.granularities = tuple(granularities)
+        self._slots = [TREND_GRANULARITIES.index(g) for g in self.granularities]
+        self.cells = {g: {} for g in self.granularities}
+        self._bucket_memo = {}
+
+    def add(self, date: str | None, members, value, month: int = -1):
+        self._fold(date, month, members, 1, value)
+
+    def _fold(self, date: str | None, month: int, members, count: int, total):
+        key = (date, month)
+        buckets = self._bucket_memo.get(key)
+        if buckets is None:
+            buckets = self._bucket_memo[key] = trend_buckets(date, month)
+        for g, slot in zip(self.granularities, self._slots):
+            bucket = buckets[slot]
+            if bucket is None:
+                continue
+            cells = self.cells[g]
+            for m in members:
+                cell = cells.get((bucket, m))
+                if cell is None:
+                    cell = cells[bucket, m] = TrendCell()
+                cell.count += count
+                cell.total += total
+
+    def remove(self, date: str | None, members, value, month: int = -1):
+        """Retract a video added earlier with the same arguments."""
+        buckets = trend_buckets(date, month)
+        for g, slot in zip(self.granularities, self._slots):
+            bucket = buckets[slot]
+            if bucket is None:
+                continue
+            cells = self.cells[g]
+            for m in members:
+                cell = cells.get((bucket, m))
+                if cell is None:
+                    continue
+                cell.count -= 1
+                cell.total -= value
+                if cell.count == 0:
+                    del cells[bucket, m]
+
+    def extend(self, table: VideoTable, rows=None):
+        """Fold in ``rows`` of ``table`` (default: every row).
+
+        Rows are summed per (date, month, member) first so each group
+        touches its cells once; only day/week buckets need the date.
+        """
+        col = table.columns.get(self.metric_key)
+        dates, months = table.dates, table.months
+        by_date = any(g in ("day", "week") for g in self.granularities)
+        wanted = None if rows is None else set(rows)
+        groups = {}
+        for code, member_rows in table.member_index().items():
+            for i in member_rows:
+                if wanted is not None and i not in wanted:
+                    continue
+                month = months[i]
+                key = (dates[i] if by_date or month < 0 else None, month, code)
+                value = col[i] if col is not None else 0
+                acc = groups.get(key)
+                if acc is None:
+                    groups[key] = [1, value]
+                else:
+                    acc[0] += 1
+                    acc[1] += value
+        names = table.member_names
+        for (date, month, code), (count, total) in groups.items():
+            self._fold(date, month, (names[code],), count, total)
+        return self
+
+    def buckets(self, granularity: str) -> list:
+        return sorted({bucket for bucket, _ in self.cells[granularity]})
+
+    def series(self, granularity: str = "month") -> dict:
+        """``{"<granularity>s": [...], "trends": {member: [{<granularity>, count, total, avg}]}}``."""
+        cells = self.cells[granularity]
+        buckets = self.buckets(granularity)
+        trends = {}
+        for member in MEMBERS_ORDER:
+            series = []
+            for bucket in buckets:
+                cell = cells.get((bucket, member))
+                count, total = (cell.count, cell.total) if cell else (0, 0)
+                series.append({granularity: bucket, "count": count, "total": total,
+                               "avg": _mean(total, count) if count else 0})
+            if any(s["count"] > 0 for s in series):
+                trends[member] = series
+        return {f"{granularity}s": buckets, "trends": trends}
+
+    def rows(self, granularity: str):
+        """Sparse ``(bucket, member, count, total, avg)`` cells, bucket then member order."""
+        cells = self.cells[granularity]
+        order = {m: i for i, m in enumerate(MEMBERS_ORDER)}
+        for bucket, member in sorted(cells, key=lambda k: (k[0], order.get(k[1], len(order)), k[1])):
+            cell = cells[bucket, member]
+            yield bucket, member, cell.count, cell.total, _mean(cell.total, cell.count)
+
+
+def compute_trends(table: VideoTable, metric_key: str, granularities=DEFAULT_TREND_GRANULARITIES) -> TrendEngine:
+    """Trend accumulators at ``granularities`` over the whole table."""
+    return TrendEngine(metric_key, granularities).extend(table)
+
+
+def compute_time_trends(table: VideoTable, metric_key: str) -> dict:
+    """Compute monthly trends per member."""
+    return TrendEngine(metric_key, ("month",)).extend(table).series("month")
+
+
+# ─── SQLite Analysis Store ──────────────────────────────────────────────────
+
+
+STORE_NAME = "ive_store.sqlite"
+STORE_METRICS = ("views_num", "likes", "comments", "favorites", "shares", "plays")
+
+
+class AnalysisStore:
+    """Normalized videos in sqlite3, for analyses run as aggregate queries.
+
+    ``videos`` holds one row per video (``pos`` is its row in the loaded
+    table, ``solo_member`` its only identified member if it has exactly one)
+    and ``video_members`` links videos to members in tag order. Indexed on
+    (platform, member), (platform, month) and (platform, metric). The load
+    key of the data it holds is kept in ``meta``, so runs with unchanged
+    inputs reuse the file as it is.
+    """
+
+    def __init__(self, path: Path | None = None):
+        self.path = path or BASE_DIR / STORE_NAME
+        self.db = sqlite3.connect(self.path)
+        metric_cols = ", ".join(f"{k} INTEGER" for k in STORE_METRICS)
+        self.db.executescript(f"""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS videos (
+                rowid INTEGER PRIMARY KEY, platform TEXT NOT NULL, pos INTEGER NOT NULL,
+                id TEXT NOT NULL, title TEXT, url TEXT, date TEXT, month TEXT, views_str TEXT,
+                {metric_cols}, solo_member TEXT);
+            CREATE TABLE IF NOT EXISTS video_members (
+                video INTEGER NOT NULL REFERENCES videos (rowid), platform TEXT NOT NULL,
+                member TEXT NOT NULL, slot INTEGER NOT NULL, PRIMARY KEY (video, slot));
+            CREATE INDEX IF NOT EXISTS video_members_member ON video_members (platform, member);
+            CREATE INDEX IF NOT EXISTS videos_id ON videos (platform, id);
+            CREATE INDEX IF NOT EXISTS videos_month ON videos (platform, month);
+        """ + "".join(f"CREATE INDEX IF NOT EXISTS videos_{k} ON videos (platform, {k});\n" for k in STORE_METRICS))
+
+    @property
+    def key(self) -> str | None:
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'load_key'").fetchone()
+        return row[0] if row else None
+
+    def load(self, data: dict, key: str = ""):
+        """Replace the stored videos with the loaded tables."""
+        with self.db:
+            self.db.execute("DELETE FROM video_members")
+            self.db.execute("DELETE FROM videos")
+            rowid = 0
+            for platform in ("tiktok", "youtube", "douyin"):
+                table = data[platform]
+                group = table.member_bits(["GROUP/UNKNOWN"])
+                videos, links = [], []
+                for i in range(len(table)):
+                    rowid += 1
+                    mask = table.member_masks[i]
+                    members = table.members_at(i)
+                    solo = members[0] if mask and not mask & (mask - 1) and mask != group else None
+                    videos.append((rowid, platform, i, table.ids[i], table.titles[i], table.urls[i],
+                                   table.dates[i], ordinal_month(table.months[i]),
+                                   table.views_str[i] if table.views_str is not None else None,
+                                   *(table.value(i, k) for k in STORE_METRICS), solo))
+                    links.extend((rowid, platform, m, slot) for slot, m in enumerate(members))
+                marks = ",".join("?" * (10 + len(STORE_METRICS)))
+                self.db.executemany(f"INSERT INTO videos VALUES ({marks})", videos)
+                self.db.executemany("INSERT INTO video_members VALUES (?, ?, ?, ?)", links)
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('load_key', ?)", (key,))
+
+    def close(self):
+        self.db.close()
+
+    @staticmethod
+    def _metric(metric_key: str) -> str:
+        if metric_key not in STORE_METRICS:
+            raise ValueError(f"unknown metric: {metric_key}")
+        return metric_key
+
+    def count(self, platform: str, solo: bool = False) -> int:
+        solo_sql = " AND solo_member IS NOT NULL" if solo else ""
+        return self.db.execute(f"SELECT COUNT(*) FROM videos WHERE platform = ?{solo_sql}", (platform,)).fetchone()[0]
+
+    def member_summaries(self, platform: str, metric_key: str, solo: bool = False) -> dict:
+        """member -> ``MetricSummary`` over the member's non-missing values, in table order.
+
+        The query selects and orders the values; they are summarized here,
+        one member's run of rows at a time.
+        """
+        k = self._metric(metric_key)
+        solo_sql = " AND v.solo_member = vm.member" if solo else ""
+        out, current, acc = {}, None, None
+        for member, value in self.db.execute(f"""
+            SELECT vm.member, v.{k}
+            FROM video_members vm JOIN videos v ON v.rowid = vm.video
+            WHERE vm.platform = ? AND v.{k} IS NOT NULL{solo_sql}
+            ORDER BY vm.member, v.pos""", (platform,)):
+            if member != current:
+                current, acc = member, out.setdefault(member, MetricSummary())
+            acc.add(value)
+        return out
+
+    def platform_stats(self, platform: str, metrics=None) -> dict:
+        """Same result as ``compute_platform_stats`` on the stored table."""
+        result = {"all": {}, "solo": {}, "sketches": {"all": {}, "solo": {}}}
+        for k in metrics or PLATFORM_METRICS[platform]:
+            for variant in ("all", "solo"):
+                accs = self.member_summaries(platform, k, solo=variant == "solo")
+                members = [m for m in MEMBERS_ORDER if m in accs]
+                result[variant][k] = {m: accs[m].summary() for m in members}
+                result["sketches"][variant][k] = {m: accs[m].sketch for m in members}
+        return result
+
+    def viral_analysis(self, platform: str, metric_key: str, thresholds: list, solo: bool = False) -> dict:
+        """Same result as ``compute_viral_analysis`` on the stored (solo) table."""
+        k = self._metric(metric_key)
+        solo_sql = " AND v.solo_member IS NOT NULL" if solo else ""
+        result = {"thresholds": thresholds, "hit_rates": {}, "top_videos": {}}
+
+        hits = ", ".join(f"SUM(v.{k} >= ?)" for _ in thresholds)
+        counts = {row[0]: row[1:] for row in self.db.execute(f"""
+            SELECT vm.member, COUNT(*){", " + hits if hits else ""}
+            FROM video_members vm JOIN videos v ON v.rowid = vm.video
+            WHERE vm.platform = ? AND v.{k} IS NOT NULL{solo_sql}
+            GROUP BY vm.member""", (*thresholds, platform))}
+        top = defaultdict(list)
+        for member, vid, title, value, url in self.db.execute(f"""
+            SELECT member, id, title, value, url FROM (
+                SELECT vm.member AS member, v.id AS id, v.title AS title, v.{k} AS value, v.url AS url,
+                       ROW_NUMBER() OVER (PARTITION BY vm.member ORDER BY v.{k} DESC, v.pos) AS n
+                FROM video_members vm JOIN videos v ON v.rowid = vm.video
+                WHERE vm.platform = ? AND v.{k} IS NOT NULL{solo_sql})
+            WHERE n <= 10 ORDER BY member, n""", (platform,)):
+            top[member].append({"id": vid, "title": title[:80], "value": value, "url": url})
 
-    return {"months": months, "trends": trends}
+        for member in MEMBERS_ORDER:
+            if member not in counts:
+                continue
+            total, *above = counts[member]
+            result["hit_rates"][member] = [{"threshold": t, "count": a, "rate": a / total}
+                                           for t, a in zip(thresholds, above)]
+            result["top_videos"][member] = top[member]
+
+        overall = self.db.execute(f"""
+            SELECT v.rowid, v.id, v.title, COALESCE(v.{k}, 0), v.url FROM videos v
+            WHERE v.platform = ?{solo_sql} ORDER BY COALESCE(v.{k}, 0) DESC, v.pos LIMIT 20""",
+                                  (platform,)).fetchall()
+        result["overall_top20"] = [
+            {"id": vid, "title": title[:80], "value": value, "members": self.members_of(rowid), "url": url}
+            for rowid, vid, title, value, url in overall
+        ]
+        return result
+
+    def members_of(self, rowid: int) -> list[str]:
+        return [m for (m,) in self.db.execute(
+            "SELECT member FROM video_members WHERE video = ? ORDER BY slot", (rowid,))]
+
+    def trend_engine(self, platform: str, metric_key: str, granularities=DEFAULT_TREND_GRANULARITIES) -> TrendEngine:
+        """``compute_trends`` fed from the stored videos, one row per video in table order."""
+        k = self._metric(metric_key)
+        engine = TrendEngine(metric_key, granularities)
+        for date, month, value, members in self.db.execute(f"""
+            SELECT v.date, v.month, COALESCE(v.{k}, 0), group_concat(vm.member, char(31))
+            FROM videos v JOIN video_members vm ON vm.video = v.rowid
+            WHERE v.platform = ? GROUP BY v.rowid ORDER BY v.pos""", (platform,)):
+            engine.add(date, members.split("\x1f"), value, month_ordinal(month))
+        return engine
+
+    def time_trends(self, platform: str, metric_key: str) -> dict:
+        """Same result as ``compute_time_trends`` on the stored table."""
+        k = self._metric(metric_key)
+        cells = {}
+        for month, member, count, total in self.db.execute(f"""
+            SELECT v.month, vm.member, COUNT(*), SUM(COALESCE(v.{k}, 0))
+            FROM video_members vm JOIN videos v ON v.rowid = vm.video
+            WHERE vm.platform = ? AND v.month IS NOT NULL
+            GROUP BY v.month, vm.member""", (platform,)):
+            cells[month, member] = (count, total)
+        months = sorted({month for month, _ in cells})
+
+        trends = {}
+        for member in MEMBERS_ORDER:
+            series = []
+            for month in months:
+                count, total = cells.get((month, member), (0, 0))
+                series.append({"month": month, "count": count, "total": total,
+                               "avg": _mean(total, count) if count else 0})
+            if any(s["count"] > 0 for s in series):
+                trends[member] = series
+        return {"months": months, "trends": trends}
 
 
 # ─── Output: Terminal ───────────────────────────────────────────────────────
@@ -434,7 +2359,7 @@ def print_terminal_summary(analysis: dict):
             )
 
     # Time trends summary
-    for platform in ["tiktok", "douyin"]:
+    for platform in ["tiktok", "youtube", "douyin"]:
         trends_key = f"{platform}_trends"
         if trends_key not in analysis:
             continue
@@ -450,7 +2375,6 @@ def print_terminal_summary(analysis: dict):
             if not series:
                 continue
             total_count = sum(s["count"] for s in series)
-            total_val = sum(s["total"] for s in series)
             peak = max(series, key=lambda s: s["total"])
             if peak["total"] > 0:
                 print(
@@ -462,20 +2386,37 @@ def print_terminal_summary(analysis: dict):
 # ─── Output: JSON ───────────────────────────────────────────────────────────
 
 
-def save_json(analysis: dict, path: Path):
+def save_json(analysis: dict, path: Path, log=print):
+    # Quantile sketches and trend engines are report inputs, not results
+    results = {k: v for k, v in analysis.items() if k not in ("sketches", "trend_engines")}
     with open(path, "w", encoding="utf-8") as f:
-        json.dump(analysis, f, ensure_ascii=False, indent=2, default=str)
-    print(f"\nSaved JSON: {path}")
+        json.dump(results, f, ensure_ascii=False, indent=2, default=str)
+    log(f"\nSaved JSON: {path}")
 
 
 # ─── Output: CSV ────────────────────────────────────────────────────────────
 
 
-def save_csvs(analysis: dict, data: dict, base_dir: Path):
+CSV_LINE_TERMINATOR = "\n"  # the published CSVs use LF; keep reruns byte-stable
+
+
+@contextlib.contextmanager
+def _csv_writer(path: Path):
+    """csv.writer on a temp file that replaces ``path`` only once fully written."""
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp, "w", newline="", encoding="utf-8-sig") as f:
+            yield csv.writer(f, lineterminator=CSV_LINE_TERMINATOR)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def save_csvs(analysis: dict, data: dict, base_dir: Path, log=print, full_data: bool = True):
+    """Write the CSV outputs; ``full_data=False`` skips the full-data CSV (when it was the input)."""
     # 1. Member rankings CSV
     rankings_path = base_dir / "ive_member_rankings.csv"
-    with open(rankings_path, "w", newline="", encoding="utf-8-sig") as f:
-        w = csv.writer(f)
+    with _csv_writer(rankings_path) as w:
         w.writerow([
             "Platform", "Member", "Videos", "Total", "Average", "Median",
             "StdDev", "Min", "Max", "P25", "P75", "P90", "P99", "Top5Avg"
@@ -492,12 +2433,11 @@ def save_csvs(analysis: dict, data: dict, base_dir: Path):
                     s["min"], s["max"], s["p25"], s["p75"], s["p90"], s["p99"],
                     round(s["top5_avg"]),
                 ])
-    print(f"Saved CSV: {rankings_path}")
+    log(f"Saved CSV: {rankings_path}")
 
     # 2. Top viral videos CSV
     viral_path = base_dir / "ive_viral_top_videos.csv"
-    with open(viral_path, "w", newline="", encoding="utf-8-sig") as f:
-        w = csv.writer(f)
+    with _csv_writer(viral_path) as w:
         w.writerow(["Platform", "Rank", "Member", "Value", "Title", "URL"])
         for platform in ["tiktok", "youtube", "douyin"]:
             viral = analysis[f"{platform}_viral"]
@@ -506,14 +2446,13 @@ def save_csvs(analysis: dict, data: dict, base_dir: Path):
                     platform.upper(), i, "/".join(v["members"]),
                     v["value"], v["title"], v["url"],
                 ])
-    print(f"Saved CSV: {viral_path}")
+    log(f"Saved CSV: {viral_path}")
 
     # 3. Monthly trends CSV
     trends_path = base_dir / "ive_monthly_trends.csv"
-    with open(trends_path, "w", newline="", encoding="utf-8-sig") as f:
-        w = csv.writer(f)
+    with _csv_writer(trends_path) as w:
         w.writerow(["Platform", "Month", "Member", "VideoCount", "TotalMetric", "AvgMetric"])
-        for platform in ["tiktok", "douyin"]:
+        for platform in ["tiktok", "youtube", "douyin"]:
             trends_key = f"{platform}_trends"
             if trends_key not in analysis:
                 continue
@@ -525,26 +2464,345 @@ def save_csvs(analysis: dict, data: dict, base_dir: Path):
                             platform.upper(), s["month"], member,
                             s["count"], round(s["total"]), round(s["avg"]),
                         ])
-    print(f"Saved CSV: {trends_path}")
+    log(f"Saved CSV: {trends_path}")
+
+    # 3b. Trends at the engines' granularities (cells with videos only)
+    engines = analysis.get("trend_engines", {})
+    all_trends_path = base_dir / "ive_trends.csv"
+    with _csv_writer(all_trends_path) as w:
+        w.writerow(["Platform", "Granularity", "Bucket", "Member", "VideoCount", "TotalMetric", "AvgMetric"])
+        for platform, engine in engines.items():
+            for g in engine.granularities:
+                for bucket, member, count, total, avg in engine.rows(g):
+                    w.writerow([platform.upper(), g, bucket, member, count, round(total), round(avg)])
+    log(f"Saved CSV: {all_trends_path}")
 
     # 4. Full video data CSV
-    full_path = base_dir / "ive_full_video_data.csv"
-    with open(full_path, "w", newline="", encoding="utf-8-sig") as f:
-        w = csv.writer(f)
+    if not full_data:
+        return
+    full_path = base_dir / FULL_DATA_CSV
+    with _csv_writer(full_path) as w:
         w.writerow([
             "Platform", "ID", "Title", "Members", "Views", "Likes",
             "Comments", "Favorites", "Shares", "Date", "URL"
         ])
         for platform_key in ["tiktok", "youtube", "douyin"]:
-            for v in data[platform_key]:
+            for v in data[platform_key].videos():
                 w.writerow([
-                    platform_key.upper(), v["id"], v.get("title", ""),
-                    "/".join(v.get("members", [])),
-                    v.get("views_num", ""), v.get("likes", ""),
-                    v.get("comments", ""), v.get("favorites", ""),
-                    v.get("shares", ""), v.get("date", ""), v.get("url", ""),
+                    platform_key.upper(), v.id, v.title, "/".join(v.members),
+                    v.views_num, v.likes, v.comments, v.favorites, v.shares, v.date, v.url,
                 ])
-    print(f"Saved CSV: {full_path}")
+    log(f"Saved CSV: {full_path}")
+
+
+# ─── Output: Binary Snapshot ───────────────────────────────────────────────
+
+
+SNAPSHOT_NAME = "ive_video_data.snap"
+SNAPSHOT_MAGIC = b"IVESNAP\0"
+SNAPSHOT_VERSION = 2
+SNAPSHOT_ALIGN = 8
+SNAPSHOT_LOG_RATIO = 0.25  # append rewrites the snapshot once its side log is this large relative to it
+SNAPSHOT_STRINGS = ("ids", "titles", "urls", "dates", "views_str")
+_SNAPSHOT_PREFIX = struct.Struct("<8sII")  # magic, version, header length
+
+
+def _snapshot_buffers(table: VideoTable):
+    """(name, typecode, buffer) for every column of ``table``, little-endian."""
+    def le(a):
+        if sys.byteorder == "big":
+            a = array(getattr(a, "typecode", None) or a.format, a)
+            a.byteswap()
+        return a
+
+    for name in SNAPSHOT_STRINGS:
+        values = getattr(table, name)
+        if values is None:
+            continue
+        if isinstance(values, SnapshotStrings):  # still mapped: copy the encoded bytes as they are
+            yield f"{name}.offsets", "q", le(values.offsets)
+            yield f"{name}.blob", "B", values.blob
+            if values.null is not None:
+                yield f"{name}.null", "B", values.null
+            continue
+        encoded = [v.encode("utf-8") if v else b"" for v in values]
+        yield f"{name}.offsets", "q", le(array("q", accumulate(map(len, encoded), initial=0)))
+        yield f"{name}.blob", "B", b"".join(encoded)
+        if None in values:
+            yield f"{name}.null", "B", bytes(v is None for v in values)
+    for k in table.metrics:
+        yield k, "q", le(table.columns[k])
+        yield f"{k}.missing", "B", table.missing[k]
+    yield "member_offsets", "q", le(table.member_offsets)
+    yield "member_codes", "H", le(table.member_codes)
+    yield "member_masks", "Q", le(table.member_masks)
+    yield "months", "i", le(table.months)
+
+
+def save_snapshot(data: dict, path: Path, batches=(), log=print):
+    """Write the loaded tables as one binary columnar snapshot.
+
+    Layout: magic, version and header length, a JSON header, then every
+    column as fixed-width little-endian values starting on an 8-byte
+    boundary. Strings are an offsets column plus a utf-8 blob (and a null
+    mask when some values are None). Offsets in the header are relative to
+    the end of the padded header. The header also lists the appended
+    ``batches`` the tables include and an ``id`` (hash of the columns) that
+    side-log entries refer to.
+    """
+    header = {"tables": []}
+    body = []
+    pos = 0
+    digest = hashlib.sha1()
+    for platform in ("tiktok", "youtube", "douyin"):
+        table = data[platform]
+        columns = {}
+        for name, typecode, buf in _snapshot_buffers(table):
+            nbytes = memoryview(buf).nbytes
+            columns[name] = [typecode, pos, nbytes]
+            body.append(buf)
+            digest.update(buf)
+            pad = -nbytes % SNAPSHOT_ALIGN
+            if pad:
+                body.append(bytes(pad))
+            pos += nbytes + pad
+        header["tables"].append({
+            "platform": platform, "rows": len(table), "metrics": list(table.metrics),
+            "member_names": table.member_names, "columns": columns,
+        })
+    header["id"] = digest.hexdigest()
+    header["batches"] = list(batches)
+    head = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    head += b" " * (-(_SNAPSHOT_PREFIX.size + len(head)) % SNAPSHOT_ALIGN)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_SNAPSHOT_PREFIX.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(head)))
+        f.write(head)
+        for buf in body:
+            f.write(buf)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    log(f"Saved snapshot: {path}")
+
+
+class SnapshotStrings:
+    """Read-only string column over a snapshot mapping, decoded per access."""
+
+    __slots__ = ("offsets", "blob", "null")
+
+    def __init__(self, offsets: memoryview, blob: memoryview, null: memoryview | None = None):
+        self.offsets = offsets
+        self.blob = blob
+        self.null = null
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if self.null is not None and self.null[i]:
+            return None
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def __iter__(self):
+        offsets, blob, null = self.offsets, self.blob, self.null
+        for i in range(len(offsets) - 1):
+            yield None if null is not None and null[i] else str(blob[offsets[i]:offsets[i + 1]], "utf-8")
+
+
+class Snapshot:
+    """Read-only, memory-mapped view of a snapshot written by ``save_snapshot``.
+
+    ``column`` returns zero-copy ``memoryview``s straight over the mapping
+    (copies on big-endian hosts); ``table`` builds a ``VideoTable`` on
+    those views. The mapping stays alive as long as any view does.
+    """
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, head_len = _SNAPSHOT_PREFIX.unpack_from(self._mm)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            self._mm.close()
+            raise ValueError(f"{path}: not a version {SNAPSHOT_VERSION} snapshot")
+        self._base = _SNAPSHOT_PREFIX.size + head_len
+        header = json.loads(self._mm[_SNAPSHOT_PREFIX.size:self._base])
+        self.meta = {t["platform"]: t for t in header["tables"]}
+        self.id = header["id"]
+        self.batches = header["batches"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        try:
+            self._mm.close()
+        except BufferError:
+            pass  # views still alive; the mapping goes away with the last of them
+
+    @property
+    def platforms(self) -> list:
+        return list(self.meta)
+
+    def __len__(self) -> int:
+        return sum(t["rows"] for t in self.meta.values())
+
+    def has_column(self, platform: str, name: str) -> bool:
+        return name in self.meta[platform]["columns"]
+
+    def _raw(self, platform: str, name: str):
+        typecode, offset, nbytes = self.meta[platform]["columns"][name]
+        start = self._base + offset
+        return typecode, memoryview(self._mm)[start:start + nbytes]
+
+    def column(self, platform: str, name: str) -> memoryview:
+        """Column ``name`` of ``platform`` as a typed ``memoryview``."""
+        typecode, view = self._raw(platform, name)
+        if sys.byteorder == "big" and typecode != "B":
+            return memoryview(self.array(platform, name))
+        return view.cast(typecode)
+
+    def array(self, platform: str, name: str) -> array:
+        """Column ``name`` copied into an ``array`` (one memcpy)."""
+        typecode, view = self._raw(platform, name)
+        values = array(typecode)
+        values.frombytes(view)
+        if sys.byteorder == "big":
+            values.byteswap()
+        return values
+
+    def string(self, platform: str, name: str, i: int) -> str | None:
+        """Row ``i`` of a string column, decoded on its own."""
+        if self.has_column(platform, f"{name}.null") and self.column(platform, f"{name}.null")[i]:
+            return None
+        offsets = self.column(platform, f"{name}.offsets")
+        return bytes(self.column(platform, f"{name}.blob")[offsets[i]:offsets[i + 1]]).decode("utf-8")
+
+    def strings(self, platform: str, name: str) -> list:
+        """Every row of a string column."""
+        offsets = self.column(platform, f"{name}.offsets")
+        blob = bytes(self.column(platform, f"{name}.blob"))
+        out = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+        if self.has_column(platform, f"{name}.null"):
+            for i, null in enumerate(self.column(platform, f"{name}.null")):
+                if null:
+                    out[i] = None
+        return out
+
+    def table(self, platform: str) -> VideoTable:
+        """``platform``'s table backed by the mapping: nothing is copied or decoded
+        up front; the first write copies the columns (``VideoTable._own``)."""
+        meta = self.meta[platform]
+        table = VideoTable(platform, tuple(meta["metrics"]), meta["member_names"])
+        for name in SNAPSHOT_STRINGS:
+            if self.has_column(platform, f"{name}.offsets"):
+                null = self.column(platform, f"{name}.null") if self.has_column(platform, f"{name}.null") else None
+                setattr(table, name, SnapshotStrings(self.column(platform, f"{name}.offsets"),
+                                                     self.column(platform, f"{name}.blob"), null))
+        for k in table.metrics:
+            table.columns[k] = self.column(platform, k)
+            table.missing[k] = self.column(platform, f"{k}.missing")
+        table.member_offsets = self.column(platform, "member_offsets")
+        table.member_codes = self.column(platform, "member_codes")
+        table.member_masks = self.column(platform, "member_masks")
+        table.months = self.column(platform, "months")
+        table._mapped = True
+        return table
+
+    def tables(self) -> dict:
+        return {p: self.table(p) for p in self.meta}
+
+
+def load_snapshot(path: Path, batches=(), root: Path | None = None) -> dict | None:
+    """Tables from a snapshot file with the appended ``batches`` it does not
+    include re-applied from their side logs, or None when it is missing,
+    unreadable or does not match ``batches``."""
+    try:
+        # Not closed here: the tables' views keep the mapping alive
+        snap = Snapshot(path)
+        if not set(snap.batches) <= set(batches):
+            return None
+        data = snap.tables()
+        for digest in batches:
+            if digest not in snap.batches and not apply_batch_rows(data, digest, snap.id, root):
+                return None
+        return data
+    except (OSError, ValueError, KeyError, struct.error):
+        return None
+
+
+# ─── Chart Payload ──────────────────────────────────────────────────────────
+
+
+CHART_STATS = ["count", "total", "mean", "median", "stdev", "min", "max",
+               "p25", "p75", "p90", "p99", "top5_avg"]
+PAYLOAD_DIGITS = 5  # significant digits kept for chart numbers; charts show at most 4
+
+
+def quantize(v):
+    """Round a chart number to ``PAYLOAD_DIGITS`` significant digits; integral values become ints."""
+    if isinstance(v, int) and abs(v) < 10 ** PAYLOAD_DIGITS:
+        return v
+    q = float(f"{v:.{PAYLOAD_DIGITS}g}")
+    return int(q) if q.is_integer() else q
+
+
+class ReportData:
+    """Shared, deduplicated data block for every chart in the report.
+
+    Panels record column-oriented payloads under ``(kind, chart_id)``; a
+    payload identical to one already recorded is stored once, and canvases
+    look theirs up through ``refs``. Member colors live in a single table
+    instead of being repeated per chart. Lazy panels also keep their tables
+    here (kinds "head" and "table"); a header shared by several tables is
+    stored once like any other payload.
+    """
+
+    KINDS = ("chart", "hist", "pctl", "head", "table")
+
+    def __init__(self):
+        self.refs = {k: {} for k in self.KINDS}
+        self.blobs = []  # serialized payloads
+        self._ids = {}   # serialized payload -> blob id
+        self._order = []  # (kind, key) in recording order, so merging keeps blob ids stable
+
+    def _add_text(self, kind: str, key: str, text: str):
+        bid = self._ids.get(text)
+        if bid is None:
+            bid = self._ids[text] = len(self.blobs)
+            self.blobs.append(text)
+        self.refs[kind][key] = bid
+        self._order.append((kind, key))
+
+    def add(self, kind: str, key: str, payload: dict):
+        self._add_text(kind, key, json.dumps(payload, ensure_ascii=False, separators=(",", ":")))
+
+    def update(self, other: "ReportData"):
+        """Fold in the payloads recorded by another (e.g. worker-local) instance."""
+        for kind, key in other._order:
+            self._add_text(kind, key, other.blobs[other.refs[kind][key]])
+
+    def to_json(self) -> str:
+        refs = {k: v for k, v in self.refs.items() if v}
+        head = json.dumps({"colors": MEMBER_COLORS, "stats": CHART_STATS, "refs": refs},
+                          ensure_ascii=False, separators=(",", ":"))
+        return head[:-1] + ',"blobs":[' + ",".join(self.blobs) + "]}"
+
+    def script_tag(self, compress: bool = False) -> str:
+        """The block as a non-executed ``<script>``; ``compress`` gzips and base64-encodes it."""
+        text = self.to_json()
+        if compress:
+            body = base64.b64encode(gzip.compress(text.encode("utf-8"), mtime=0)).decode("ascii")
+            return f'<script type="application/octet-stream" id="report-data" data-encoding="gzip-base64">{body}</script>\n'
+        text = text.replace("</", "<\\/")  # keep member names from closing the tag
+        return f'<script type="application/json" id="report-data">{text}</script>\n'
 
 
 # ─── HTML Table Builders ──────────────────────────────────────────────────
@@ -554,9 +2812,9 @@ def _th(label, sort_type="num"):
     return f'<th data-sort="{sort_type}">{label} <span class="sort-arrow">&#x25B2;&#x25BC;</span></th>'
 
 
-def _td_member(member):
+def _td_member(member, label=None):
     c = MEMBER_COLORS.get(member, "#666")
-    return f'<td data-sort-value="{member}"><span class="member-tag" style="background:{c}22;border-color:{c}">{member}</span></td>'
+    return f'<td data-sort-value="{member}"><span class="member-tag" style="background:{c}22;border-color:{c}">{label or member}</span></td>'
 
 
 def _td_num(value, display=None):
@@ -565,230 +2823,222 @@ def _td_num(value, display=None):
     return f'<td class="num" data-sort-value="{value}">{display}</td>'
 
 
+def _td_link(title, url):
+    ts = title.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    return f'<td><a href="{url}" target="_blank">{ts}</a></td>'
+
+
+class Table:
+    """A sortable report table as plain lists, rendered here or in the browser.
+
+    ``head`` holds ``[label, kind]`` per column, kind being "member", "num"
+    or "link"; ``rows`` holds one list of cells per row. Cells by kind:
+    member -> a name, or ``[name, label]`` for a tag colored as ``name``;
+    num -> an int shown as is, or ``[value, display]``; link -> ``[title, url]``.
+    ``html`` yields the markup; lazy panels put ``head`` and ``payload_rows``
+    in the report data block instead and ``buildTable`` (JS) makes the same
+    table on first open.
+    """
+
+    __slots__ = ("head", "rows")
+
+    def __init__(self, head):
+        self.head = head
+        self.rows = []
+
+    def payload_rows(self) -> list:
+        """``rows`` for the data block: sort values quantized like chart numbers, displays kept as rendered."""
+        def cell(kind, c):
+            if kind != "num":
+                return c
+            value, display = c if isinstance(c, list) else (c, str(c))
+            if not isinstance(value, (int, float)):
+                return c
+            q = quantize(value)
+            return q if isinstance(q, int) and display == str(q) else [q, display]
+
+        return [[cell(kind, c) for (_, kind), c in zip(self.head, row)] for row in self.rows]
+
+    def html(self):
+        yield '<table class="data-table sortable"><thead><tr>'
+        for label, kind in self.head:
+            yield f'<th>{label}</th>' if kind == "link" else _th(label, kind)
+        yield '</tr></thead><tbody>'
+        for row in self.rows:
+            cells = []
+            for (_, kind), cell in zip(self.head, row):
+                if kind == "link":
+                    cells.append(_td_link(*cell))
+                elif kind == "member":
+                    cells.append(_td_member(*cell) if isinstance(cell, list) else _td_member(cell))
+                else:
+                    cells.append(_td_num(*cell) if isinstance(cell, list) else _td_num(cell, str(cell)))
+            yield f'<tr>{"".join(cells)}</tr>'
+        yield '</tbody></table>'
+
+
 def _tbl_distribution(rankings, members_list):
-    h = '<table class="data-table sortable"><thead><tr>'
-    h += _th("Member", "member")
-    for c in ["Videos", "Total", "Average", "Median", "StdDev", "Min", "Max", "P25", "P75", "P90", "P99", "Top5 Avg"]:
-        h += _th(c)
-    h += '</tr></thead><tbody>'
+    keys = ["total", "mean", "median", "stdev", "min", "max", "p25", "p75", "p90", "p99", "top5_avg"]
+    table = Table([["Member", "member"], ["Videos", "num"],
+                   *([c, "num"] for c in ["Total", "Average", "Median", "StdDev", "Min", "Max",
+                                          "P25", "P75", "P90", "P99", "Top5 Avg"])])
     for m in members_list:
         s = rankings.get(m)
         if not s:
             continue
-        h += f'<tr>{_td_member(m)}{_td_num(s["count"], str(s["count"]))}'
-        for k in ["total", "mean", "median", "stdev", "min", "max", "p25", "p75", "p90", "p99", "top5_avg"]:
-            h += _td_num(s[k], fmt_num(s[k]))
-        h += '</tr>'
-    h += '</tbody></table>'
-    return h
+        table.rows.append([m, s["count"], *([s[k], fmt_num(s[k])] for k in keys)])
+    yield table
 
 
-_chart_counter = [0]
+def _metric_panel(rankings, members_list, metric_label, videos=None, metric_key=None, section_title="", sketches=None,
+                  chart_id="", payload=None):
+    """Distribution table + bar chart + distribution curve chart.
 
-
-def _metric_panel(rankings, members_list, metric_label, videos=None, metric_key=None, section_title=""):
-    """Distribution table + bar chart + distribution curve chart."""
+    ``sketches`` maps member -> ``QuantileSketch`` for the percentile curve;
+    members without one get a sketch built from ``videos``. Canvas ids are
+    derived from ``chart_id`` (the tab panel id), so a panel renders the
+    same wherever and in whatever order it is built. Chart data goes into
+    ``payload`` (a ``ReportData``) under ``chart_id``, not into the markup.
+    """
+    payload = payload if payload is not None else ReportData()
     ctx = f"IVE {section_title}" if section_title else "IVE"
-    table = _tbl_distribution(rankings, members_list)
-    _chart_counter[0] += 1
-    cid = f"mchart{_chart_counter[0]}"
-    chart_items = []
-    for m in members_list:
-        s = rankings.get(m)
-        if not s:
-            continue
-        chart_items.append({
-            "m": m, "c": MEMBER_COLORS.get(m, "#666"),
-            "count": s["count"], "total": s["total"], "mean": s["mean"],
-            "median": s["median"], "stdev": s["stdev"], "min": s["min"],
-            "max": s["max"], "p25": s["p25"], "p75": s["p75"],
-            "p90": s["p90"], "p99": s["p99"], "top5_avg": s["top5_avg"],
-        })
-    chart_data = json.dumps(chart_items, ensure_ascii=False)
+    yield from _tbl_distribution(rankings, members_list)
+    cid = f"mchart-{chart_id}"
+    chart_members = [m for m in members_list if rankings.get(m)]
+    chart_cols = {"m": chart_members}
+    for k in CHART_STATS:
+        chart_cols[k] = [quantize(rankings[m][k]) for m in chart_members]
+    payload.add("chart", chart_id, chart_cols)
     bar_title = f"{ctx} — {metric_label} per Member (sorted by current column)"
     bar_canvas = (f'<div class="chart-wrap" style="margin-top:16px">'
                   f'<h4 style="color:#94a3b8;margin-bottom:8px;font-size:0.95em">{bar_title}</h4>'
                   f'<canvas id="{cid}" class="metric-chart" '
-                  f"data-chart='{chart_data}' "
+                  f'data-chart="{chart_id}" '
                   f'data-label="{metric_label}"></canvas></div>')
 
     # Distribution curve (histogram)
     dist_canvas = ""
-    if videos and metric_key:
-        all_vals = [v[metric_key] for v in videos if v.get(metric_key) is not None and v[metric_key] > 0]
-        if all_vals:
-            all_vals_sorted = sorted(all_vals)
-            p95 = all_vals_sorted[min(int(len(all_vals_sorted) * 0.95), len(all_vals_sorted) - 1)]
+    col = videos.columns.get(metric_key) if videos is not None and metric_key else None
+    if col is not None:
+        buckets = videos.buckets(metric_key)
+        p95 = buckets.positive_percentile(0.95)
+        if p95 is not None:
             cap = max(p95, 1)
             num_bins = 20
-            bin_w = cap / num_bins
-            bin_edges = [round(i * bin_w) for i in range(num_bins + 1)]
+            bin_edges = linear_edges(cap, num_bins)
             bin_labels = [fmt_num(e) for e in bin_edges[:-1]]
 
-            hist_members = []
+            hist_members, hist_vals = [], []
             for m in members_list:
                 s = rankings.get(m)
                 if not s or s["count"] == 0:
                     continue
-                member_vals = [v[metric_key] for v in videos
-                               if m in v.get("members", []) and v.get(metric_key) is not None]
-                total_m = len(member_vals) if member_vals else 1
-                counts = [0] * num_bins
-                for val in member_vals:
-                    placed = False
-                    for i in range(num_bins):
-                        if val < bin_edges[i + 1]:
-                            counts[i] += 1
-                            placed = True
-                            break
-                    if not placed:
-                        counts[-1] += 1
+                total_m = buckets.total(m) or 1
+                counts = buckets.histogram(m, bin_edges)
                 pcts = [round(c / total_m * 100, 1) for c in counts]
-                hist_members.append({"m": m, "c": MEMBER_COLORS.get(m, "#666"), "pcts": pcts})
+                hist_members.append(m)
+                hist_vals.append(pcts)
 
-            _chart_counter[0] += 1
-            did = f"dchart{_chart_counter[0]}"
-            hist_data = json.dumps({"bins": bin_labels, "members": hist_members}, ensure_ascii=False)
+            did = f"dchart-{chart_id}"
+            payload.add("hist", chart_id, {"labels": bin_labels, "m": hist_members, "vals": hist_vals})
             hist_title = f"{ctx} — {metric_label} Distribution: % of Each Member's Videos per {metric_label} Range"
             dist_canvas = (f'<div class="chart-wrap" style="margin-top:12px">'
                            f'<h4 style="color:#94a3b8;margin-bottom:8px;font-size:0.95em">'
                            f'{hist_title}</h4>'
                            f'<canvas id="{did}" class="dist-chart" '
-                           f"data-hist='{hist_data}'></canvas></div>")
+                           f'data-hist="{chart_id}"></canvas></div>')
 
             # Percentile curve: x=P1..P99, y=value at that percentile
             pctl_points = [1, 5, 10, 25, 50, 75, 90, 95, 99]
             pctl_labels = [f"P{p}" for p in pctl_points]
-            pctl_members = []
+            pctl_members, pctl_vals = [], []
             for m in members_list:
                 s = rankings.get(m)
                 if not s or s["count"] == 0:
                     continue
-                member_vals = sorted(
-                    v.get(metric_key) for v in videos
-                    if m in v.get("members", []) and v.get(metric_key) is not None
-                )
-                n = len(member_vals)
+                sketch = (sketches or {}).get(m)
+                if sketch is None:
+                    sketch = QuantileSketch()
+                    sketch.extend(buckets.values(m))
+                n = sketch.n
                 if n == 0:
                     continue
                 vals = []
                 for p in pctl_points:
-                    idx = min(int(n * p / 100), n - 1)
-                    val = member_vals[idx]
-                    vals.append(max(val, 1))  # floor to 1 for log scale
-                pctl_members.append({"m": m, "c": MEMBER_COLORS.get(m, "#666"), "vals": vals})
-
-            _chart_counter[0] += 1
-            pid = f"pchart{_chart_counter[0]}"
-            pctl_data = json.dumps({"labels": pctl_labels, "members": pctl_members}, ensure_ascii=False)
+                    val = sketch.at_rank(min(int(n * p / 100), n - 1))
+                    vals.append(quantize(max(val, 1)))  # floor to 1 for log scale
+                pctl_members.append(m)
+                pctl_vals.append(vals)
+
+            pid = f"pchart-{chart_id}"
+            payload.add("pctl", chart_id, {"labels": pctl_labels, "m": pctl_members, "vals": pctl_vals})
             pctl_title = f"{ctx} — {metric_label} Percentile Curve: Value at P1 to P99 per Member (Log Scale)"
             pctl_canvas = (f'<div class="chart-wrap" style="margin-top:12px">'
                            f'<h4 style="color:#94a3b8;margin-bottom:8px;font-size:0.95em">'
                            f'{pctl_title}</h4>'
                            f'<canvas id="{pid}" class="pctl-chart" '
-                           f"data-pctl='{pctl_data}'></canvas></div>")
+                           f'data-pctl="{chart_id}"></canvas></div>')
             dist_canvas += "\n" + pctl_canvas
 
-    return table + "\n" + bar_canvas + "\n" + dist_canvas
+    yield "\n" + bar_canvas + "\n" + dist_canvas
 
 
 def _tbl_viral_rates(viral, rankings, members_list):
-    thresholds = viral["thresholds"]
-    h = '<table class="data-table sortable"><thead><tr>'
-    h += _th("Member", "member") + _th("Videos")
-    for t in thresholds:
-        h += _th(f">{fmt_num(t, 0)} Cnt") + _th("Rate")
-    h += '</tr></thead><tbody>'
+    table = Table([["Member", "member"], ["Videos", "num"],
+                   *(h for t in viral["thresholds"] for h in ([f">{fmt_num(t, 0)} Cnt", "num"], ["Rate", "num"]))])
     for m in members_list:
         rates = viral["hit_rates"].get(m, [])
         s = rankings.get(m, {})
         if not rates or not s:
             continue
-        h += f'<tr>{_td_member(m)}{_td_num(s.get("count", 0), str(s.get("count", 0)))}'
+        row = [m, s.get("count", 0)]
         for r in rates:
-            h += _td_num(r["count"], str(r["count"]))
-            h += _td_num(r["rate"] * 100, f'{r["rate"]*100:.1f}%')
-        h += '</tr>'
-    h += '</tbody></table>'
-    return h
-
-
-def _tbl_tiers(videos, metric_key, tiers, members_list):
-    mt = defaultdict(lambda: {t[0]: 0 for t in tiers})
-    totals = defaultdict(int)
-    members_set = set(members_list)
-    for v in videos:
-        val = v.get(metric_key, 0)
-        for m in v.get("members", ["GROUP/UNKNOWN"]):
-            if m not in members_set:
-                continue
-            totals[m] += 1
-            for label, lo, hi in tiers:
-                if lo <= val < hi:
-                    mt[m][label] += 1
-                    break
-    h = '<table class="data-table sortable"><thead><tr>'
-    h += _th("Member", "member") + _th("Total")
-    for label, _, _ in tiers:
-        h += _th(label) + _th("%")
-    h += '</tr></thead><tbody>'
+            row += [r["count"], [r["rate"] * 100, f'{r["rate"]*100:.1f}%']]
+        table.rows.append(row)
+    yield table
+
+
+def _tbl_tiers(table, metric_key, tiers, members_list):
+    buckets = table.buckets(metric_key, missing_as_zero=True)
+    out = Table([["Member", "member"], ["Total", "num"], *(h for label, _, _ in tiers for h in ([label, "num"], ["%", "num"]))])
     for m in members_list:
-        t = totals.get(m, 0)
+        t = buckets.total(m)
         if t == 0:
             continue
-        h += f'<tr>{_td_member(m)}{_td_num(t, str(t))}'
-        for label, _, _ in tiers:
-            c = mt[m][label]
-            p = c / t * 100 if t else 0
-            h += _td_num(c, str(c)) + _td_num(p, f'{p:.1f}%')
-        h += '</tr>'
-    h += '</tbody></table>'
-    return h
+        row = [m, t]
+        for c in buckets.tier_counts(m, tiers):
+            p = c / t * 100
+            row += [c, [p, f'{p:.1f}%']]
+        out.rows.append(row)
+    yield out
 
 
 def _tbl_top20(viral, metric_label):
     top20 = viral.get("overall_top20", [])
     if not top20:
-        return '<p class="note">No data</p>'
-    h = '<table class="data-table sortable"><thead><tr>'
-    h += _th("#") + _th("Member", "member") + _th(metric_label) + '<th>Title</th>'
-    h += '</tr></thead><tbody>'
+        yield '<p class="note">No data</p>'
+        return
+    table = Table([["#", "num"], ["Member", "member"], [metric_label, "num"], ["Title", "link"]])
     for i, v in enumerate(top20, 1):
         ms = ", ".join(v["members"])
         fm = v["members"][0] if v["members"] else "GROUP/UNKNOWN"
-        ts = v["title"].replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-        url = v.get("url", "")
-        h += f'<tr>{_td_num(i, str(i))}'
-        c = MEMBER_COLORS.get(fm, "#666")
-        h += f'<td data-sort-value="{fm}"><span class="member-tag" style="background:{c}22;border-color:{c}">{ms}</span></td>'
-        h += f'{_td_num(v["value"], fmt_num(v["value"]))}'
-        h += f'<td><a href="{url}" target="_blank">{ts}</a></td></tr>'
-    h += '</tbody></table>'
-    return h
+        table.rows.append([i, fm if ms == fm else [fm, ms], [v["value"], fmt_num(v["value"])],
+                           [v["title"], v.get("url", "")]])
+    yield table
 
 
 def _tbl_member_top5(viral, members_list):
-    h = '<table class="data-table sortable"><thead><tr>'
-    h += _th("Member", "member") + _th("#") + _th("Value") + '<th>Title</th>'
-    h += '</tr></thead><tbody>'
+    table = Table([["Member", "member"], ["#", "num"], ["Value", "num"], ["Title", "link"]])
     for m in members_list:
         top_vids = viral.get("top_videos", {}).get(m, [])
         for i, v in enumerate(top_vids[:5], 1):
-            ts = v["title"].replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-            url = v.get("url", "")
-            h += f'<tr>{_td_member(m)}{_td_num(i, str(i))}'
-            h += f'{_td_num(v["value"], fmt_num(v["value"]))}'
-            h += f'<td><a href="{url}" target="_blank">{ts}</a></td></tr>'
-    h += '</tbody></table>'
-    return h
+            table.rows.append([m, i, [v["value"], fmt_num(v["value"])], [v["title"], v.get("url", "")]])
+    yield table
 
 
 def _tbl_consistency(rankings, members_list):
-    h = '<table class="data-table sortable"><thead><tr>'
-    h += _th("Member", "member") + _th("Videos")
-    for c in ["Mean", "Median", "StdDev", "CV (σ/μ)", "Med/Mean", "Max/Mean", "P25/P75"]:
-        h += _th(c)
-    h += '</tr></thead><tbody>'
+    table = Table([["Member", "member"], ["Videos", "num"],
+                   *([c, "num"] for c in ["Mean", "Median", "StdDev", "CV (σ/μ)", "Med/Mean", "Max/Mean", "P25/P75"])])
     for m in members_list:
         s = rankings.get(m, {})
         if not s:
@@ -797,17 +3047,12 @@ def _tbl_consistency(rankings, members_list):
         mm = s["median"] / s["mean"] if s["mean"] > 0 else 0
         xm = s["max"] / s["mean"] if s["mean"] > 0 else 0
         pp = s["p25"] / s["p75"] if s["p75"] > 0 else 0
-        h += f'<tr>{_td_member(m)}{_td_num(s["count"], str(s["count"]))}'
-        h += _td_num(s["mean"], fmt_num(s["mean"]))
-        h += _td_num(s["median"], fmt_num(s["median"]))
-        h += _td_num(s["stdev"], fmt_num(s["stdev"]))
-        h += _td_num(cv, f'{cv:.2f}')
-        h += _td_num(mm, f'{mm:.2f}')
-        h += _td_num(xm, f'{xm:.1f}x')
-        h += _td_num(pp, f'{pp:.2f}')
-        h += '</tr>'
-    h += '</tbody></table>'
-    return h
+        table.rows.append([
+            m, s["count"],
+            [s["mean"], fmt_num(s["mean"])], [s["median"], fmt_num(s["median"])], [s["stdev"], fmt_num(s["stdev"])],
+            [cv, f'{cv:.2f}'], [mm, f'{mm:.2f}'], [xm, f'{xm:.1f}x'], [pp, f'{pp:.2f}'],
+        ])
+    yield table
 
 
 def _tbl_power_rankings(rankings, viral, members_list):
@@ -824,147 +3069,201 @@ def _tbl_power_rankings(rankings, viral, members_list):
     for name, fn in metrics:
         for rank, m in enumerate(sorted(active, key=fn, reverse=True), 1):
             member_ranks[m][name] = rank
-    h = '<table class="data-table sortable"><thead><tr>'
-    h += _th("Member", "member")
-    for name, _ in metrics:
-        h += _th(name)
-    h += _th("Avg Rank")
-    h += '</tr></thead><tbody>'
+    table = Table([["Member", "member"], *([name, "num"] for name, _ in metrics), ["Avg Rank", "num"]])
     for m in members_list:
         if m not in member_ranks:
             continue
         ranks = member_ranks[m]
         avg = sum(ranks.values()) / len(ranks) if ranks else 99
-        h += f'<tr>{_td_member(m)}'
+        row = [m]
         for name, _ in metrics:
             r = ranks.get(name, "-")
-            h += _td_num(r, f'#{r}')
-        h += _td_num(avg, f'{avg:.1f}')
-        h += '</tr>'
-    h += '</tbody></table>'
-    return h
+            row.append([r, f'#{r}'])
+        row.append([avg, f'{avg:.1f}'])
+        table.rows.append(row)
+    yield table
 
 
-def _build_section(sid, title, note, tabs):
-    """tabs: list of (key, label, html_content) tuples."""
-    h = f'<div class="section" id="{sid}">\n<h2>{title}</h2>\n'
+def _build_section(sid, title, note, tabs, payload=None, lazy=False):
+    """tabs: list of (key, label, content) tuples; content is an iterable of chunks
+    (markup strings and ``Table``s).
+
+    With ``lazy``, only the first tab's tables are rendered in place; the
+    others go into ``payload`` as row data and are built when first opened.
+    """
+    yield f'<div class="section" id="{sid}">\n<h2>{title}</h2>\n'
     if note:
-        h += f'<p class="note">{note}</p>\n'
-    h += '<div class="tab-nav">\n'
+        yield f'<p class="note">{note}</p>\n'
+    yield '<div class="tab-nav">\n'
     for i, (key, label, _) in enumerate(tabs):
         act = " active" if i == 0 else ""
-        h += f'<button class="tab-btn{act}" data-target="{sid}-{key}">{label}</button>\n'
-    h += '</div>\n'
+        yield f'<button class="tab-btn{act}" data-target="{sid}-{key}">{label}</button>\n'
+    yield '</div>\n'
     for i, (key, _, content) in enumerate(tabs):
         act = " active" if i == 0 else ""
-        h += f'<div class="tab-panel{act}" id="{sid}-{key}">\n{content}\n</div>\n'
-    h += '</div>\n'
-    return h
+        pid = f"{sid}-{key}"
+        deferred = lazy and i > 0
+        attrs = ' data-lazy="1"' if deferred else ""
+        yield f'<div class="tab-panel{act}" id="{pid}"{attrs}>\n'
+        n = 0
+        for chunk in content:
+            if not isinstance(chunk, Table):
+                yield chunk
+            elif deferred:
+                payload.add("head", f"{pid}-{n}", chunk.head)
+                payload.add("table", f"{pid}-{n}", chunk.payload_rows())
+                yield f'<div class="lazy-table" data-table="{pid}-{n}"></div>'
+                n += 1
+            else:
+                yield from chunk.html()
+        yield '\n</div>\n'
+    yield '</div>\n'
+
+
+def _ttyt_tabs(sid, table, views_r, likes_r, comments_r, shares_r, viral, mlist, metric_key, tiers, stitle="", sk=None, payload=None):
+    """Tabs for TikTok/YouTube (likes first, then views/comments/shares)."""
+    sk = sk or {}
+    return [
+        ("likes", "Likes", _metric_panel(likes_r, mlist, "Likes", table, "likes", stitle, sk.get("likes"), f"{sid}-likes", payload)),
+        ("views", "Views", _metric_panel(views_r, mlist, "Views", table, "views_num", stitle, sk.get("views_num"), f"{sid}-views", payload)),
+        ("comments", "Comments", _metric_panel(comments_r, mlist, "Comments", table, "comments", stitle, sk.get("comments"), f"{sid}-comments", payload)),
+        ("shares", "Shares", _metric_panel(shares_r, mlist, "Shares", table, "shares", stitle, sk.get("shares"), f"{sid}-shares", payload)),
+        ("viral", "Viral Rates", _tbl_viral_rates(viral, views_r, mlist)),
+        ("tiers", "Tiers", _tbl_tiers(table, metric_key, tiers, mlist)),
+        ("top20", "Top 20", _tbl_top20(viral, "Views")),
+        ("top5", "Member Top 5", _tbl_member_top5(viral, mlist)),
+        ("consistency", "Consistency", _tbl_consistency(views_r, mlist)),
+        ("rankings", "Rankings", _tbl_power_rankings(views_r, viral, mlist)),
+    ]
+
+
+def _douyin_tabs(sid, table, likes_r, comments_r, favorites_r, shares_r, viral, mlist, tiers, stitle="", sk=None, payload=None):
+    """Tabs for Douyin (likes first, then comments/favorites/shares)."""
+    sk = sk or {}
+    return [
+        ("likes", "Likes", _metric_panel(likes_r, mlist, "Likes", table, "likes", stitle, sk.get("likes"), f"{sid}-likes", payload)),
+        ("comments", "Comments", _metric_panel(comments_r, mlist, "Comments", table, "comments", stitle, sk.get("comments"), f"{sid}-comments", payload)),
+        ("favorites", "Favorites", _metric_panel(favorites_r, mlist, "Favorites", table, "favorites", stitle, sk.get("favorites"), f"{sid}-favorites", payload)),
+        ("shares", "Shares", _metric_panel(shares_r, mlist, "Shares", table, "shares", stitle, sk.get("shares"), f"{sid}-shares", payload)),
+        ("viral", "Viral Rates", _tbl_viral_rates(viral, likes_r, mlist)),
+        ("tiers", "Tiers", _tbl_tiers(table, "likes", tiers, mlist)),
+        ("top20", "Top 20", _tbl_top20(viral, "Likes")),
+        ("top5", "Member Top 5", _tbl_member_top5(viral, mlist)),
+        ("consistency", "Consistency", _tbl_consistency(likes_r, mlist)),
+        ("rankings", "Rankings", _tbl_power_rankings(likes_r, viral, mlist)),
+    ]
+
+
+def _render_section(sid, title, note, tabs_fn, *args, payload=None, lazy=False):
+    """One report section as chunks; tab content is only built as it is consumed."""
+    payload = payload if payload is not None else ReportData()
+    return _build_section(sid, title, note, tabs_fn(sid, *args, payload=payload), payload, lazy)
+
+
+def _render_section_html(*spec, lazy=False):
+    """One report section joined into a string, plus its chart data: a unit for the render worker pool."""
+    payload = ReportData()
+    return "".join(_render_section(*spec, payload=payload, lazy=lazy)), payload
 
 
 # ─── Output: HTML Report ─────────────────────────────────────────────────
 
 
+HTML_BUFFER_SIZE = 1 << 20
+
 TT_TIERS = [("<1M", 0, 1e6), ("1-5M", 1e6, 5e6), ("5-10M", 5e6, 10e6), ("10-20M", 10e6, 20e6), ("20M+", 20e6, float("inf"))]
 YT_TIERS = [("<500K", 0, 5e5), ("500K-2M", 5e5, 2e6), ("2-5M", 2e6, 5e6), ("5-10M", 5e6, 10e6), ("10M+", 10e6, float("inf"))]
 DY_TIERS = [("<50K", 0, 5e4), ("50-200K", 5e4, 2e5), ("200-500K", 2e5, 5e5), ("500K-1M", 5e5, 1e6), ("1M+", 1e6, float("inf"))]
 
 
-def generate_html(analysis: dict, data: dict, path: Path):
+def generate_html(analysis: dict, data: dict, path: Path, log=print, jobs: int = 1, compress_data: bool = False,
+                  lazy: bool = True):
+    """Write the interactive report; the six sections render on up to ``jobs`` processes.
+
+    All chart data lands in one shared ``ReportData`` block after the sections;
+    ``compress_data`` stores it gzipped and base64-encoded. ``lazy`` moves the
+    table rows of every tab panel but the first of each section into that
+    block as well, so the browser only builds a table when its tab is first opened;
+    without it every table is rendered up front as markup.
+    """
     members_all = MEMBERS_ORDER
     members_solo = [m for m in MEMBERS_ORDER if m != "GROUP/UNKNOWN"]
-    solo = data.get("solo", {})
+    solo = data.get("solo") or {p: data[p].take([]) for p in ("tiktok", "youtube", "douyin")}
+    sketches = analysis.get("sketches", {})
+
+    def _sk(platform, variant):
+        return sketches.get(platform, {}).get(variant)
 
     # Summary stats
     total_tt = len(data["tiktok"])
     total_yt = len(data["youtube"])
     total_dy = len(data["douyin"])
     total_all = total_tt + total_yt + total_dy
-    tt_total_views = sum(v["views_num"] for v in data["tiktok"])
-    yt_total_views = sum(v["views_num"] for v in data["youtube"])
-    dy_total_likes = sum(v.get("likes", 0) for v in data["douyin"])
-    tt_dates = [v["date"] for v in data["tiktok"] if v.get("date")]
+    tt_total_views = sum(data["tiktok"].columns["views_num"])
+    yt_total_views = sum(data["youtube"].columns["views_num"])
+    dy_total_likes = sum(data["douyin"].columns["likes"])
+    tt_dates = [d for d in data["tiktok"].dates if d]
     tt_date_range = f"{min(tt_dates)} to {max(tt_dates)}" if tt_dates else "N/A"
-    yt_dates = [v["date"] for v in data["youtube"] if v.get("date")]
+    yt_dates = [d for d in data["youtube"].dates if d]
     yt_date_range = f"{min(yt_dates)} to {max(yt_dates)}" if yt_dates else "N/A"
-    dy_dates = [v["date"] for v in data["douyin"] if v.get("date")]
+    dy_dates = [d for d in data["douyin"].dates if d]
     dy_date_range = f"{min(dy_dates)} to {max(dy_dates)}" if dy_dates else "N/A"
 
 
-    # ── Helper: build tabs for TikTok/YouTube (likes first, then views/comments/shares) ──
-    def _ttyt_tabs(videos, views_r, likes_r, comments_r, shares_r, viral, mlist, metric_key, tiers, stitle=""):
-        return [
-            ("likes", "Likes", _metric_panel(likes_r, mlist, "Likes", videos, "likes", stitle)),
-            ("views", "Views", _metric_panel(views_r, mlist, "Views", videos, "views_num", stitle)),
-            ("comments", "Comments", _metric_panel(comments_r, mlist, "Comments", videos, "comments", stitle)),
-            ("shares", "Shares", _metric_panel(shares_r, mlist, "Shares", videos, "shares", stitle)),
-            ("viral", "Viral Rates", _tbl_viral_rates(viral, views_r, mlist)),
-            ("tiers", "Tiers", _tbl_tiers(videos, metric_key, tiers, mlist)),
-            ("top20", "Top 20", _tbl_top20(viral, "Views")),
-            ("top5", "Member Top 5", _tbl_member_top5(viral, mlist)),
-            ("consistency", "Consistency", _tbl_consistency(views_r, mlist)),
-            ("rankings", "Rankings", _tbl_power_rankings(views_r, viral, mlist)),
-        ]
-
-    # ── Helper: build tabs for Douyin (likes first, then comments/favorites/shares) ──
-    def _douyin_tabs(videos, likes_r, comments_r, favorites_r, shares_r, viral, mlist, tiers, stitle=""):
-        return [
-            ("likes", "Likes", _metric_panel(likes_r, mlist, "Likes", videos, "likes", stitle)),
-            ("comments", "Comments", _metric_panel(comments_r, mlist, "Comments", videos, "comments", stitle)),
-            ("favorites", "Favorites", _metric_panel(favorites_r, mlist, "Favorites", videos, "favorites", stitle)),
-            ("shares", "Shares", _metric_panel(shares_r, mlist, "Shares", videos, "shares", stitle)),
-            ("viral", "Viral Rates", _tbl_viral_rates(viral, likes_r, mlist)),
-            ("tiers", "Tiers", _tbl_tiers(videos, "likes", tiers, mlist)),
-            ("top20", "Top 20", _tbl_top20(viral, "Likes")),
-            ("top5", "Member Top 5", _tbl_member_top5(viral, mlist)),
-            ("consistency", "Consistency", _tbl_consistency(likes_r, mlist)),
-            ("rankings", "Rankings", _tbl_power_rankings(likes_r, viral, mlist)),
-        ]
-
-    # ── Build 6 sections ──
-    sections_html = ""
-
-    sections_html += _build_section("all-tiktok", "All TikTok",
-        f"{total_tt} videos &bull; {fmt_num(tt_total_views)} total views &bull; Date range: {tt_date_range}",
-        _ttyt_tabs(data["tiktok"], analysis["tiktok_rankings"],
-                   analysis["tiktok_likes_rankings"], analysis["tiktok_comments_rankings"],
-                   analysis["tiktok_shares_rankings"], analysis["tiktok_viral"],
-                   members_all, "views_num", TT_TIERS, "All TikTok"))
-
-    sections_html += _build_section("all-youtube", "All YouTube",
-        f"{total_yt} videos &bull; {fmt_num(yt_total_views)} total views",
-        _ttyt_tabs(data["youtube"], analysis["youtube_rankings"],
-                   analysis["youtube_likes_rankings"], analysis["youtube_comments_rankings"],
-                   analysis["youtube_shares_rankings"], analysis["youtube_viral"],
-                   members_all, "views_num", YT_TIERS, "All YouTube"))
-
-    sections_html += _build_section("all-douyin", "All Douyin",
-        f"{total_dy} videos &bull; {fmt_num(dy_total_likes)} total likes &bull; Douyin API does not expose view counts",
-        _douyin_tabs(data["douyin"], analysis["douyin_rankings"],
-                     analysis["douyin_comments_rankings"], analysis["douyin_favorites_rankings"],
-                     analysis["douyin_shares_rankings"], analysis["douyin_viral"],
-                     members_all, DY_TIERS, "All Douyin"))
-
-    sections_html += _build_section("solo-tiktok", "Solo TikTok",
-        f"{len(solo.get('tiktok', []))} solo videos &bull; Single-member videos only",
-        _ttyt_tabs(solo.get("tiktok", []), analysis["solo_tiktok_rankings"],
-                   analysis["solo_tiktok_likes"], analysis["solo_tiktok_comments"],
-                   analysis["solo_tiktok_shares"], analysis["solo_tiktok_viral"],
-                   members_solo, "views_num", TT_TIERS, "Solo TikTok"))
-
-    sections_html += _build_section("solo-youtube", "Solo YouTube",
-        f"{len(solo.get('youtube', []))} solo videos &bull; Single-member videos only",
-        _ttyt_tabs(solo.get("youtube", []), analysis["solo_youtube_rankings"],
-                   analysis["solo_youtube_likes"], analysis["solo_youtube_comments"],
-                   analysis["solo_youtube_shares"], analysis["solo_youtube_viral"],
-                   members_solo, "views_num", YT_TIERS, "Solo YouTube"))
-
-    sections_html += _build_section("solo-douyin", "Solo Douyin",
-        f"{len(solo.get('douyin', []))} solo videos &bull; Single-member videos only",
-        _douyin_tabs(solo.get("douyin", []), analysis["solo_douyin_rankings"],
-                     analysis.get("solo_douyin_comments", {}), analysis.get("solo_douyin_favorites", {}),
-                     analysis.get("solo_douyin_shares", {}), analysis["solo_douyin_viral"],
-                     members_solo, DY_TIERS, "Solo Douyin"))
+    # ── Build 6 sections, each an independent render stage ──
+    sections = [
+        ("all-tiktok", "All TikTok",
+         f"{total_tt} videos &bull; {fmt_num(tt_total_views)} total views &bull; Date range: {tt_date_range}",
+         _ttyt_tabs, data["tiktok"], analysis["tiktok_rankings"],
+         analysis["tiktok_likes_rankings"], analysis["tiktok_comments_rankings"],
+         analysis["tiktok_shares_rankings"], analysis["tiktok_viral"],
+         members_all, "views_num", TT_TIERS, "All TikTok", _sk("tiktok", "all")),
+        ("all-youtube", "All YouTube",
+         f"{total_yt} videos &bull; {fmt_num(yt_total_views)} total views",
+         _ttyt_tabs, data["youtube"], analysis["youtube_rankings"],
+         analysis["youtube_likes_rankings"], analysis["youtube_comments_rankings"],
+         analysis["youtube_shares_rankings"], analysis["youtube_viral"],
+         members_all, "views_num", YT_TIERS, "All YouTube", _sk("youtube", "all")),
+        ("all-douyin", "All Douyin",
+         f"{total_dy} videos &bull; {fmt_num(dy_total_likes)} total likes &bull; Douyin API does not expose view counts",
+         _douyin_tabs, data["douyin"], analysis["douyin_rankings"],
+         analysis["douyin_comments_rankings"], analysis["douyin_favorites_rankings"],
+         analysis["douyin_shares_rankings"], analysis["douyin_viral"],
+         members_all, DY_TIERS, "All Douyin", _sk("douyin", "all")),
+        ("solo-tiktok", "Solo TikTok",
+         f"{len(solo.get('tiktok', []))} solo videos &bull; Single-member videos only",
+         _ttyt_tabs, solo["tiktok"], analysis["solo_tiktok_rankings"],
+         analysis["solo_tiktok_likes"], analysis["solo_tiktok_comments"],
+         analysis["solo_tiktok_shares"], analysis["solo_tiktok_viral"],
+         members_solo, "views_num", TT_TIERS, "Solo TikTok", _sk("tiktok", "solo")),
+        ("solo-youtube", "Solo YouTube",
+         f"{len(solo.get('youtube', []))} solo videos &bull; Single-member videos only",
+         _ttyt_tabs, solo["youtube"], analysis["solo_youtube_rankings"],
+         analysis["solo_youtube_likes"], analysis["solo_youtube_comments"],
+         analysis["solo_youtube_shares"], analysis["solo_youtube_viral"],
+         members_solo, "views_num", YT_TIERS, "Solo YouTube", _sk("youtube", "solo")),
+        ("solo-douyin", "Solo Douyin",
+         f"{len(solo.get('douyin', []))} solo videos &bull; Single-member videos only",
+         _douyin_tabs, solo["douyin"], analysis["solo_douyin_rankings"],
+         analysis.get("solo_douyin_comments", {}), analysis.get("solo_douyin_favorites", {}),
+         analysis.get("solo_douyin_shares", {}), analysis["solo_douyin_viral"],
+         members_solo, DY_TIERS, "Solo Douyin", _sk("douyin", "solo")),
+    ]
+    report_data = ReportData()
+
+    def section_chunks():
+        if jobs <= 1:
+            # Serial: stream every table row straight through to the file
+            for spec in sections:
+                yield from _render_section(*spec, payload=report_data, lazy=lazy)
+            return
+        # Parallel: each worker returns one whole section, joined in section order
+        stages = [Stage(spec[0], partial(_render_section_html, *spec, lazy=lazy)) for spec in sections]
+        rendered = run_stages(stages, jobs=jobs)
+        for st in stages:
+            html, part = rendered.pop(st.name)
+            report_data.update(part)
+            yield html
 
     # ── Build analysis HTML from markdown ──
     def _md_to_html(md_path):
@@ -1067,7 +3366,7 @@ def generate_html(analysis: dict, data: dict, path: Path):
         nav_html += f'<a class="section-nav-btn" href="#{sid}">{label}</a>\n'
     nav_html += '</nav>\n'
 
-    html = f"""<!DOCTYPE html>
+    head = f"""<!DOCTYPE html>
 <html lang="en">
 <head>
 <meta charset="UTF-8">
@@ -1147,7 +3446,8 @@ header .subtitle {{ color: #94a3b8; font-size: 1.1em; margin-top: 8px; }}
 
 {nav_html}
 
-{sections_html}
+"""
+    tail = f"""
 
 <div class="section" id="analysis">
 <h2>Analysis</h2>
@@ -1171,6 +3471,39 @@ const colLabels = [null, 'Videos', 'Total', 'Average', 'Median', 'StdDev', 'Min'
 // Store chart instances keyed by canvas ID
 const charts = {{}};
 
+// ── Shared chart data (one block per report, canvases reference it by key) ──
+let reportData = null;
+const payloadCache = {{}};
+
+async function loadReportData() {{
+  const el = document.getElementById('report-data');
+  if (el.dataset.encoding === 'gzip-base64') {{
+    const bytes = Uint8Array.from(atob(el.textContent.trim()), ch => ch.charCodeAt(0));
+    const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+    return JSON.parse(await new Response(stream).text());
+  }}
+  return JSON.parse(el.textContent);
+}}
+
+// Rows per member for a canvas: chart → [{{m, c, count, ...}}], hist/pctl → {{labels, members: [{{m, c, vals}}]}}
+function payload(kind, key) {{
+  const id = kind + ':' + key;
+  if (!(id in payloadCache)) {{
+    const blob = reportData.blobs[reportData.refs[kind][key]];
+    const color = m => reportData.colors[m] || '#666';
+    if (kind === 'chart') {{
+      payloadCache[id] = blob.m.map((m, i) => {{
+        const d = {{ m, c: color(m) }};
+        reportData.stats.forEach(k => {{ d[k] = blob[k][i]; }});
+        return d;
+      }});
+    }} else {{
+      payloadCache[id] = {{ labels: blob.labels, members: blob.m.map((m, i) => ({{ m, c: color(m), vals: blob.vals[i] }})) }};
+    }}
+  }}
+  return payloadCache[id];
+}}
+
 function fmtVal(v) {{
   if (v >= 1e9) return (v/1e9).toFixed(1) + 'B';
   if (v >= 1e6) return (v/1e6).toFixed(1) + 'M';
@@ -1218,7 +3551,7 @@ function syncChart(table, colIdx, descending) {{
   const chart = charts[canvas.id];
   if (!chart) return;
 
-  const items = JSON.parse(canvas.dataset.chart);
+  const items = payload('chart', canvas.dataset.chart);
   const key = colKeys[colIdx] || 'mean';
   const label = colLabels[colIdx] || 'Average';
 
@@ -1236,7 +3569,7 @@ function syncChart(table, colIdx, descending) {{
 // ── Create chart instance ──
 function initChart(canvas) {{
   if (charts[canvas.id]) return;
-  const items = JSON.parse(canvas.dataset.chart);
+  const items = payload('chart', canvas.dataset.chart);
   // Default: sort by mean descending
   const sorted = [...items].sort((a, b) => b.mean - a.mean);
   const chart = new Chart(canvas, {{
@@ -1267,10 +3600,10 @@ const distCharts = {{}};
 
 function initDistChart(canvas) {{
   if (distCharts[canvas.id]) return;
-  const hist = JSON.parse(canvas.dataset.hist);
+  const hist = payload('hist', canvas.dataset.hist);
   const datasets = hist.members.map(m => ({{
     label: m.m,
-    data: m.pcts,
+    data: m.vals,
     borderColor: m.c,
     backgroundColor: m.c + '22',
     borderWidth: 2,
@@ -1280,7 +3613,7 @@ function initDistChart(canvas) {{
   }}));
   distCharts[canvas.id] = new Chart(canvas, {{
     type: 'line',
-    data: {{ labels: hist.bins, datasets }},
+    data: {{ labels: hist.labels, datasets }},
     options: {{
       responsive: true,
       plugins: {{
@@ -1301,7 +3634,7 @@ const pctlCharts = {{}};
 
 function initPctlChart(canvas) {{
   if (pctlCharts[canvas.id]) return;
-  const pctl = JSON.parse(canvas.dataset.pctl);
+  const pctl = payload('pctl', canvas.dataset.pctl);
   const datasets = pctl.members.map(m => ({{
     label: m.m,
     data: m.vals,
@@ -1338,21 +3671,80 @@ function sortAndSync(table, colIdx, descending) {{
 }}
 
 // ── Attach click handlers to all sortable tables ──
-document.querySelectorAll('table.sortable').forEach(table => {{
-  const sortRow = table.querySelector('thead tr:last-child') || table.querySelector('thead tr');
-  if (!sortRow) return;
-  const ths = sortRow.querySelectorAll('th[data-sort]');
-  ths.forEach((th, colIdx) => {{
-    let ascending = true;
-    th.addEventListener('click', () => {{
-      sortAndSync(table, colIdx, !ascending);
-      ascending = !ascending;
+function bindSortable(root) {{
+  root.querySelectorAll('table.sortable').forEach(table => {{
+    const sortRow = table.querySelector('thead tr:last-child') || table.querySelector('thead tr');
+    if (!sortRow) return;
+    const ths = sortRow.querySelectorAll('th[data-sort]');
+    ths.forEach((th, colIdx) => {{
+      let ascending = true;
+      th.addEventListener('click', () => {{
+        sortAndSync(table, colIdx, !ascending);
+        ascending = !ascending;
+      }});
     }});
   }});
-}});
+}}
+bindSortable(document);
+
+// ── Lazy panels: table rows wait in the data block until the tab is first opened ──
+function buildTable(head, rows) {{
+  const table = document.createElement('table');
+  table.className = 'data-table sortable';
+  const headRow = table.createTHead().insertRow();
+  head.forEach(([label, kind]) => {{
+    const th = headRow.appendChild(document.createElement('th'));
+    if (kind === 'link') {{ th.textContent = label; return; }}
+    th.dataset.sort = kind;
+    const arrow = document.createElement('span');
+    arrow.className = 'sort-arrow';
+    arrow.textContent = '\u25B2\u25BC';
+    th.append(label + ' ', arrow);
+  }});
+  const body = table.createTBody();
+  rows.forEach(row => {{
+    const tr = body.insertRow();
+    row.forEach((cell, i) => {{
+      const td = tr.insertCell();
+      const kind = head[i][1];
+      if (kind === 'link') {{
+        const a = td.appendChild(document.createElement('a'));
+        a.href = cell[1];
+        a.target = '_blank';
+        a.textContent = cell[0];
+      }} else if (kind === 'member') {{
+        const [m, label] = Array.isArray(cell) ? cell : [cell, cell];
+        const c = reportData.colors[m] || '#666';
+        const tag = td.appendChild(document.createElement('span'));
+        tag.className = 'member-tag';
+        tag.style.cssText = `background:${{c}}22;border-color:${{c}}`;
+        tag.textContent = label;
+        td.dataset.sortValue = m;
+      }} else {{
+        const [v, text] = Array.isArray(cell) ? cell : [cell, String(cell)];
+        td.className = 'num';
+        td.dataset.sortValue = v;
+        td.textContent = text;
+      }}
+    }});
+  }});
+  return table;
+}}
+
+function fillPanel(panel) {{
+  if (!panel.dataset.lazy) return;
+  panel.querySelectorAll('.lazy-table').forEach(el => {{
+    const key = el.dataset.table;
+    el.replaceWith(buildTable(reportData.blobs[reportData.refs.head[key]], reportData.blobs[reportData.refs.table[key]]));
+  }});
+  delete panel.dataset.lazy;
+  bindSortable(panel);
+}}
 
 // ── Init: default sort by Average (col 3) desc + init charts for active panels ──
 function initPanel(panel) {{
+  if (!reportData) return;  // active panels are initialised once the data block is decoded
+  fillPanel(panel);
   panel.querySelectorAll('.metric-chart').forEach(initChart);
   panel.querySelectorAll('.dist-chart').forEach(initDistChart);
   panel.querySelectorAll('.pctl-chart').forEach(initPctlChart);
@@ -1362,7 +3754,10 @@ function initPanel(panel) {{
     }}
   }});
 }}
-document.querySelectorAll('.tab-panel.active').forEach(initPanel);
+loadReportData().then(d => {{
+  reportData = d;
+  document.querySelectorAll('.tab-panel.active').forEach(initPanel);
+}});
 
 // ── Tab switching ──
 document.querySelectorAll('.tab-btn').forEach(btn => {{
@@ -1397,79 +3792,1089 @@ document.querySelectorAll('.section[id]').forEach(s => observer.observe(s));
 </body>
 </html>"""
 
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(html)
-    print(f"Saved HTML report: {path}")
+    # Stream to a temp file through a buffered writer, then swap it in
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8", buffering=HTML_BUFFER_SIZE) as f:
+        f.write(head)
+        f.writelines(section_chunks())
+        f.write(report_data.script_tag(compress_data))
+        f.write(tail)
+    os.replace(tmp, path)
+    log(f"Saved HTML report: {path}")
+
+
+# ─── Stage Scheduler ────────────────────────────────────────────────────────
+
+
+class Stage:
+    """One node of the pipeline DAG.
+
+    ``fn`` is called with the values named by ``inputs``, in order, and its
+    result is stored under ``name``. ``kind`` picks the executor: "cpu"
+    stages go to the process pool (``fn`` and inputs must pickle), "io"
+    stages to the thread pool, and "main" stages run on the calling
+    thread (for stages that start process pools of their own). A stage with ``log`` set is passed a
+    ``log=`` callable instead of printing; its lines are printed in stage
+    declaration order, so output does not depend on ``jobs``.
+    """
+
+    __slots__ = ("name", "fn", "inputs", "kind", "log")
+
+    def __init__(self, name: str, fn, inputs=(), kind: str = "cpu", log: bool = False):
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+        self.kind = kind
+        self.log = log
+
+
+def run_stages(stages: list, values: dict | None = None, jobs: int = 1) -> dict:
+    """Run ``stages`` once their inputs exist and return every value by name.
+
+    Stages must be declared after the stages they depend on. With
+    ``jobs <= 1`` they run inline in declaration order; otherwise ready
+    stages run concurrently on up to ``jobs`` workers per pool.
+    """
+    values = dict(values or {})
+    known = set(values)
+    for st in stages:
+        missing = [name for name in st.inputs if name not in known]
+        if missing:
+            raise ValueError(f"stage {st.name!r} needs {missing} before it is declared")
+        known.add(st.name)
+
+    logs = {st.name: [] for st in stages}
+    printed = 0
+
+    def call(st: Stage):
+        args = [values[name] for name in st.inputs]
+        if st.log:
+            return st.fn(*args, log=logs[st.name].append)
+        return st.fn(*args)
+
+    def flush():
+        nonlocal printed
+        while printed < len(stages) and stages[printed].name in values:
+            for line in logs[stages[printed].name]:
+                print(line)
+            printed += 1
+
+    if jobs <= 1:
+        for st in stages:
+            values[st.name] = call(st)
+            flush()
+        return values
+
+    pools = {}
+
+    def pool(kind: str):
+        if kind not in pools:
+            if kind == "cpu":
+                # spawn, not fork: the thread pool may already be running
+                pools[kind] = ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("spawn"))
+            else:
+                pools[kind] = ThreadPoolExecutor(max_workers=jobs)
+        return pools[kind]
+
+    pending = list(stages)
+    running = {}
+    try:
+        while pending or running:
+            ready = [st for st in pending if all(name in values for name in st.inputs)]
+            inline = []
+            for st in ready:
+                pending.remove(st)
+                if st.kind == "main":
+                    inline.append(st)
+                    continue
+                args = [values[name] for name in st.inputs]
+                kwargs = {"log": logs[st.name].append} if st.log else {}
+                running[pool(st.kind).submit(st.fn, *args, **kwargs)] = st
+            # Main-thread stages overlap with the pooled ones just submitted
+            for st in inline:
+                values[st.name] = call(st)
+            if running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    values[running.pop(fut).name] = fut.result()
+            flush()
+    finally:
+        for executor in pools.values():
+            executor.shutdown(cancel_futures=True)
+    return values
+
+
+# ─── Stage Cache ────────────────────────────────────────────────────────────
+
+
+SOURCE_FILES = list(dict.fromkeys(a.filename for a in SOURCE_ADAPTERS))
+ANALYSIS_FILES = ["IVE_ANALYSIS.md", "IVE_ANALYSIS_TOXIC.md"]
+HASH_MEMO_MIN_AGE_NS = 2_000_000_000
+
+
+def file_digest(path: Path, memo: dict | None = None) -> str | None:
+    """sha1 of a file's contents, None when it is missing.
+
+    ``memo`` maps paths to ``[size, mtime_ns, digest]``; a file whose size
+    and mtime still match is not read again. Files modified in the last
+    couple of seconds are not memoized (mtimes may be coarse).
+    """
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    stamp, name = [st.st_size, st.st_mtime_ns], os.path.abspath(path)
+    hit = memo.get(name) if memo is not None else None
+    if hit and hit[:2] == stamp:
+        return hit[2]
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    if memo is not None and time.time_ns() - st.st_mtime_ns > HASH_MEMO_MIN_AGE_NS:
+        memo[name] = [*stamp, digest]
+    return digest
+
+
+def content_hash(*parts, memo: dict | None = None) -> str:
+    """sha1 over file digests (``Path`` parts, see ``file_digest``) and reprs of everything else."""
+    h = hashlib.sha1()
+    for part in parts:
+        if isinstance(part, Path):
+            digest = file_digest(part, memo)
+            h.update(b"<missing>" if digest is None else digest.encode("ascii"))
+        else:
+            h.update(repr(part).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class StageCache:
+    """Manifest of stage input hashes, plus pickled stage outputs.
+
+    A stage is fresh when the hash recorded for it by the last run equals
+    the hash of its current inputs (and its output files still exist);
+    ``main`` skips fresh stages and reads their output back with ``load``.
+    Input files' digests are kept in the manifest too (``hash``), so an
+    unchanged file costs one stat rather than a full read.
+    """
+
+    def __init__(self, root: Path, force: bool = False):
+        self.root = root
+        self.force = force
+        self.path = root / "manifest.json"
+        try:
+            self.manifest = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.manifest = {}
+        if force or not isinstance(self.manifest.get("files"), dict):
+            self.manifest["files"] = {}  # --force re-reads every input once
+        self.files = self.manifest["files"]
+
+    def hash(self, *parts) -> str:
+        """``content_hash`` with file digests memoized in the manifest."""
+        before = dict(self.files)
+        key = content_hash(*parts, memo=self.files)
+        if self.files != before:
+            self._save()
+        return key
+
+    def fresh(self, stage: str, key: str, outputs=()) -> bool:
+        if self.force or self.manifest.get(stage) != key:
+            return False
+        return all(p.exists() for p in outputs)
+
+    def load(self, stage: str):
+        """Pickled output of ``stage``, or None when it cannot be read back."""
+        try:
+            with open(self.root / f"{stage}.pickle", "rb") as f:
+                return pickle.load(f)
+        except (OSError, EOFError, AttributeError, pickle.UnpicklingError):
+            return None
+
+    def done(self, stage: str, key: str, output=None):
+        """Record ``stage`` as built from ``key``, saving ``output`` if given."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        if output is not None:
+            tmp = self.root / f"{stage}.pickle.tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump(output, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.root / f"{stage}.pickle")
+        self.manifest[stage] = key
+        self._save()
+
+    def _save(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.manifest, indent=2), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+# ─── Query CLI ──────────────────────────────────────────────────────────────
+
+
+# Query metric names -> table metric keys
+QUERY_METRICS = {"views": "views_num", "likes": "likes", "comments": "comments",
+                 "favorites": "favorites", "shares": "shares", "plays": "plays"}
+
+
+def select_rows(table: VideoTable, members=(), together: bool = False, solo: bool = False,
+                since: str | None = None, until: str | None = None) -> list:
+    """Rows matching a query, in table order.
+
+    ``members`` keeps rows tagged with any of them (all of them with
+    ``together``); ``solo`` keeps rows with exactly one identified member.
+    ``since``/``until`` are inclusive ISO date prefixes (``2025``, ``2025-01``
+    or ``2025-01-31``); rows without a date drop out when either is given.
+    """
+    if together and members:
+        rows = table.rows_with_all(*members)
+    elif members:
+        rows = sorted({i for m in members for i in table.rows_with(m)})
+    else:
+        rows = range(len(table))
+    if solo:
+        solo_set = set(table.solo_rows())
+        rows = [i for i in rows if i in solo_set]
+    if since or until:
+        dates = table.dates
+        rows = [i for i in rows if dates[i]
+                and (not since or dates[i][:len(since)] >= since)
+                and (not until or dates[i][:len(until)] <= until)]
+    return list(rows)
+
+
+def print_query_result(table: VideoTable, rows: list, metric_key: str, members=(), percentiles=(), top: int = 0,
+                       title: str = ""):
+    """Per-member stats (plus percentiles) and top videos for selected rows, ``print_terminal_summary`` style."""
+    sub = table.take(rows)
+    stats = compute_platform_stats(sub, [metric_key])
+    rankings = stats["all"][metric_key]
+    sketches = stats["sketches"]["all"][metric_key]
+    label = next((name for name, k in QUERY_METRICS.items() if k == metric_key), metric_key).title()
+    shown = [m for m in (members or MEMBERS_ORDER) if m in rankings]
+
+    print(f"\n{'─' * 80}")
+    print(f"  {table.platform.upper()} — {title or 'Query'} ({len(rows)} videos) — by {label}")
+    print(f"{'─' * 80}")
+    cols = [f"P{p:g}" for p in percentiles]
+    print(f"  {'Member':<16} {'Videos':>7} {'Total':>10} {'Average':>10} {'Median':>10} {'Max':>10} {'Top5 Avg':>10}"
+          + "".join(f" {c:>10}" for c in cols))
+    print(f"  {'─' * 15} {'─' * 7}" + f" {'─' * 10}" * (5 + len(cols)))
+    for member in shown:
+        s = rankings[member]
+        n = s["count"]
+        pvals = [sketches[member].at_rank(n - 1 - int(n * (100 - p) / 100)) for p in percentiles]
+        print(
+            f"  {member:<16} {s['count']:>7} {fmt_num(s['total']):>10} "
+            f"{fmt_num(s['mean']):>10} {fmt_num(s['median']):>10} "
+            f"{fmt_num(s['max']):>10} {fmt_num(s['top5_avg']):>10}"
+            + "".join(f" {fmt_num(v):>10}" for v in pvals)
+        )
+    if not shown:
+        print("  (no matching videos)")
+
+    if top:
+        col, miss = sub.columns[metric_key], sub.missing[metric_key]
+        order = sorted((i for i in range(len(sub)) if not miss[i]), key=lambda i: -col[i])
+        print(f"\n  Top {top} {table.platform.upper()} Videos:")
+        for rank, i in enumerate(order[:top], 1):
+            members_str = ", ".join(sub.members_at(i))
+            print(f"  {rank}. {fmt_num(col[i]):>8} | {members_str:<16} | {sub.titles[i][:50]}")
+
+
+def run_query(args, get_data) -> int:
+    """``analyze_ive.py query``: answer one filtered aggregation from the loaded snapshot."""
+    metric_key = QUERY_METRICS[args.metric]
+    members = [m.strip().upper() for m in (args.members or "").split(",") if m.strip()]
+    unknown = [m for m in members if m not in MEMBERS_ORDER]
+    if unknown:
+        print(f"Unknown member(s): {', '.join(unknown)} (choose from {', '.join(MEMBERS_ORDER)})", file=sys.stderr)
+        return 2
+    try:
+        percentiles = [float(p) for p in (args.percentiles or "").split(",") if p.strip()]
+    except ValueError:
+        print(f"Bad --percentiles: {args.percentiles}", file=sys.stderr)
+        return 2
+    if any(not 0 <= p <= 100 for p in percentiles):
+        print("Percentiles must be between 0 and 100", file=sys.stderr)
+        return 2
+
+    data = get_data()
+    bits = ["solo" if args.solo else "all videos"]
+    if members:
+        bits.append(("together: " if args.together else "") + "/".join(members))
+    if args.since or args.until:
+        bits.append(f"{args.since or '…'} to {args.until or '…'}")
+    title = ", ".join(bits)
+    for platform in args.platform or ["tiktok", "youtube", "douyin"]:
+        table = data[platform]
+        if metric_key not in table.columns:
+            print(f"\n  {platform.upper()}: no {args.metric} data")
+            continue
+        rows = select_rows(table, members, args.together, args.solo, args.since, args.until)
+        print_query_result(table, rows, metric_key, members, percentiles, args.top, title)
+    return 0
+
+
+# ─── HTTP API ───────────────────────────────────────────────────────────────
+
+
+API_PLATFORMS = ("tiktok", "youtube", "douyin")
+API_PRIMARY_METRIC = {"tiktok": "views", "youtube": "views", "douyin": "likes"}
+API_METRICS = {"tiktok": ("views", "likes", "comments", "shares"),
+               "youtube": ("views", "likes", "comments", "shares"),
+               "douyin": ("likes", "comments", "favorites", "shares")}
+API_RELOAD_INTERVAL = 1.0  # seconds between checks of the analysis file
+API_GZIP_MIN = 512         # smaller bodies are sent uncompressed
+API_PARAMS = ("member", "solo", "limit")
+API_MEMO_MAX = 4096        # memoized responses kept before the memo is reset
+
+
+def rankings_key(platform: str, metric: str, solo: bool = False) -> str:
+    """Analysis dict key of a platform's rankings for ``metric`` (all or solo videos)."""
+    if metric == API_PRIMARY_METRIC[platform]:
+        return f"solo_{platform}_rankings" if solo else f"{platform}_rankings"
+    return f"solo_{platform}_{metric}" if solo else f"{platform}_{metric}_rankings"
+
+
+class APIError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class AnalysisAPI:
+    """JSON views over ``ive_analysis.json`` for ``serve``.
+
+    Each distinct request (path + query) is rendered once and memoized with
+    its ETag and, on first demand, its gzipped body. The analysis file is
+    re-read when its mtime or size changes, which also drops the memo.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._checked = 0.0
+        self.analysis = {}
+        self.version = ""
+        self._memo = {}
+        self._reload()
+
+    def _reload(self):
+        st = self.path.stat()
+        stamp = (st.st_mtime_ns, st.st_size)
+        if stamp == self._stamp:
+            return
+        raw = self.path.read_bytes()
+        self.analysis = json.loads(raw)
+        self.version = hashlib.sha1(raw).hexdigest()[:16]
+        self._memo = {}
+        self._stamp = stamp
+
+    def refresh(self):
+        """Hot reload: re-read the analysis if it changed (checked at most once per interval)."""
+        now = time.monotonic()
+        if now - self._checked < API_RELOAD_INTERVAL:
+            return
+        with self._lock:
+            if now - self._checked < API_RELOAD_INTERVAL:
+                return
+            self._checked = now
+            try:
+                self._reload()
+            except (OSError, ValueError):
+                pass  # mid-write or removed: keep serving the last good copy
+
+    def get(self, path: str, query: str = "") -> dict:
+        """Memoized response: ``{"etag", "body", "gzip"}`` (gzip filled in by ``gzipped``)."""
+        self.refresh()
+        memo = self._memo
+        params = {k: v[-1] for k, v in urllib.parse.parse_qs(query).items() if k in API_PARAMS}
+        key = (path, tuple(sorted(params.items())))
+        entry = memo.get(key)
+        if entry is None:
+            if len(memo) >= API_MEMO_MAX:
+                memo.clear()
+            body = json.dumps(self.render(path, params), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            etag = f'"{self.version}-{hashlib.sha1(body).hexdigest()[:16]}"'
+            entry = memo[key] = {"etag": etag, "body": body, "gzip": None}
+        return entry
+
+    @staticmethod
+    def gzipped(entry: dict) -> bytes:
+        if entry["gzip"] is None:
+            entry["gzip"] = gzip.compress(entry["body"], mtime=0)
+        return entry["gzip"]
+
+    def render(self, path: str, params: dict):
+        parts = [p for p in path.split("/") if p]
+        if parts[:1] != ["api"]:
+            raise APIError(404, "not found")
+        if len(parts) == 1:
+            return {
+                "version": self.version,
+                "platforms": {p: list(API_METRICS[p]) for p in API_PLATFORMS},
+                "members": MEMBERS_ORDER,
+                "endpoints": [
+                    "/api/rankings/<platform>[/<metric>]?member=&solo=1",
+                    "/api/viral/<platform>?member=&solo=1",
+                    "/api/top/<platform>?member=&solo=1&limit=",
+                    "/api/trends/<platform>?member=",
+                ],
+            }
+        kind, platform, *rest = parts[1:] + [None]
+        if platform not in API_PLATFORMS:
+            raise APIError(404, f"unknown platform: {platform}")
+        member = params.get("member", "").upper() or None
+        if member and member not in MEMBERS_ORDER:
+            raise APIError(404, f"unknown member: {member}")
+        solo = params.get("solo", "") in ("1", "true", "yes")
+        a = self.analysis
+
+        if kind == "rankings":
+            metric = rest[0] or API_PRIMARY_METRIC[platform]
+            if metric not in API_METRICS[platform]:
+                raise APIError(404, f"unknown metric for {platform}: {metric}")
+            rankings = a.get(rankings_key(platform, metric, solo), {})
+            return rankings.get(member, {}) if member else rankings
+        if kind in ("viral", "top"):
+            viral = a.get(f"solo_{platform}_viral" if solo else f"{platform}_viral")
+            if viral is None:
+                raise APIError(404, f"no viral analysis for {platform}")
+            if kind == "viral":
+                if member:
+                    return {"thresholds": viral["thresholds"], "hit_rates": viral["hit_rates"].get(member, []),
+                            "top_videos": viral["top_videos"].get(member, [])}
+                return {k: viral[k] for k in ("thresholds", "hit_rates", "top_videos")}
+            try:
+                limit = int(params.get("limit", 20))
+            except ValueError:
+                raise APIError(400, "limit must be an integer")
+            videos = viral["top_videos"].get(member, []) if member else viral["overall_top20"]
+            return videos[:max(limit, 0)]
+        if kind == "trends":
+            trends = a.get(f"{platform}_trends")
+            if trends is None:
+                raise APIError(404, f"no trends for {platform}")
+            if member:
+                return {"months": trends["months"], "trends": {member: trends["trends"].get(member, [])}}
+            return trends
+        raise APIError(404, f"unknown endpoint: {kind}")
+
+
+class _APIHandler(BaseHTTPRequestHandler):
+    server_version = "IVEAnalysis/1.0"
+    protocol_version = "HTTP/1.1"
+    timeout = 30  # drop idle keep-alive connections so they free their pool thread
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+    def do_GET(self):
+        path, _, query = self.path.partition("?")
+        try:
+            entry = self.server.api.get(path, query)
+        except APIError as e:
+            body = json.dumps({"error": str(e)}).encode("utf-8")
+            self.send_response(e.status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if entry["etag"] in (t.strip() for t in self.headers.get("If-None-Match", "").split(",")):
+            self.send_response(304)
+            self.send_header("ETag", entry["etag"])
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = entry["body"]
+        use_gzip = len(body) >= API_GZIP_MIN and "gzip" in self.headers.get("Accept-Encoding", "")
+        if use_gzip:
+            body = AnalysisAPI.gzipped(entry)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("ETag", entry["etag"])
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class PooledHTTPServer(HTTPServer):
+    """``HTTPServer`` that handles connections on a fixed thread pool."""
+
+    daemon_threads = True
+
+    def __init__(self, address, handler, api: AnalysisAPI, threads: int = 8, quiet: bool = False):
+        super().__init__(address, handler)
+        self.api = api
+        self.quiet = quiet
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="ive-api")
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_server(args) -> int:
+    """``analyze_ive.py serve``: JSON API over ``ive_analysis.json`` until interrupted."""
+    path = BASE_DIR / "ive_analysis.json"
+    if not path.exists():
+        print(f"{path} not found; run analyze_ive.py first", file=sys.stderr)
+        return 1
+    server = PooledHTTPServer((args.host, args.port), _APIHandler, AnalysisAPI(path), args.threads, args.quiet)
+    print(f"Serving {path.name} on http://{args.host}:{server.server_address[1]}/api ({args.threads} threads)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+# ─── Benchmark ──────────────────────────────────────────────────────────────
+
+
+BENCH_SIZES = {"10k": 10_000, "100k": 100_000, "1M": 1_000_000, "10M": 10_000_000}
+BENCH_SPLIT = {"tiktok": 0.37, "youtube": 0.41, "douyin": 0.22}  # as in the published sample
+BENCH_STAGES = ("load", "tagging", "stats", "viral", "trends", "csv", "json", "html")
+BENCH_RESULTS = "bench_results.json"
+BENCH_BASELINE = "bench_baseline.json"
+BENCH_TOLERANCE = 0.25   # slower by more than this fraction of the baseline is a regression...
+BENCH_MIN_DELTA = 0.1    # ...when it is also at least this many seconds (or MB) worse
+BENCH_DATASET_VERSION = 3
+BENCH_EPOCH = (1_630_454_400, 1_769_904_000)  # upload times: 2021-09-01 .. 2026-02-01 UTC
+
+# Title filler in the languages fans post in, around the member aliases
+BENCH_WORDS = ["IVE", "#IVE", "아이브", "アイヴ", "fancam", "直拍", "舞台", "可爱", "챌린지", "challenge",
+               "#Shorts", "ダンス", "behind", "vlog", "#kpop", "I AM", "After LIKE", "Baddie", "HEYA",
+               "ATTITUDE", "REBEL HEART", "직캠", "彩排", "💕", "✨", "🎀", "cute", "live", "생일"]
+
+try:
+    import resource  # optional: POSIX only, for peak RSS
+except ImportError:
+    resource = None
+
+
+def parse_size(text: str) -> int:
+    """'10k' / '1M' / '2500' -> row count."""
+    text = text.strip()
+    mult = {"k": 1_000, "m": 1_000_000}.get(text[-1:].lower(), 1)
+    return int(float(text[:-1] if mult > 1 else text) * mult)
+
+
+def _bench_aliases() -> dict:
+    """Literal alias spellings per member (regex word boundaries dropped)."""
+    return {m: [re.sub(r"\\b", "", p) for p in pats] for m, pats in MEMBER_PATTERNS.items()}
+
+
+def _bench_title(rng, aliases: dict, members: list) -> str:
+    words = rng.sample(BENCH_WORDS, rng.randint(1, 4))
+    for m in members:
+        words.insert(rng.randint(0, len(words)), rng.choice(aliases[m]))
+    return " ".join(words)
+
+
+def _bench_members(rng, names: list) -> list:
+    r = rng.random()
+    if r < 0.35:
+        return []
+    return rng.sample(names, 1 if r < 0.85 else 2)
+
+
+def _bench_counts(rng) -> tuple:
+    """Heavy-tailed (views, likes, comments, shares): lognormal views, lognormal ratios."""
+    views = int(rng.lognormvariate(13, 1.6))
+    likes = int(views * min(rng.lognormvariate(-2.5, 0.5), 1.0))
+    comments = int(likes * rng.lognormvariate(-4.5, 0.7))
+    shares = int(likes * rng.lognormvariate(-4, 0.9))
+    return views, likes, comments, shares
+
+
+def _bench_records(platform: str, n: int, seed: int):
+    rng = random.Random(f"{seed}-{platform}")
+    aliases = _bench_aliases()
+    names = list(aliases)
+    lo, hi = BENCH_EPOCH
+    for i in range(n):
+        members = _bench_members(rng, names)
+        title = _bench_title(rng, aliases, members)
+        ts = rng.randint(lo, hi)
+        views, likes, comments, shares = _bench_counts(rng)
+        shown = int(float(f"{views:.2g}"))  # scraped view counts come rounded to two digits
+        if platform == "tiktok":
+            vid = str(ts << 32 | rng.getrandbits(32))
+            v = {"id": vid, "url": PLATFORM_URLS["tiktok"].format(id=vid), "title": title,
+                 "views": f"{shown / 1e6:.1f}M views" if shown >= 10_000_000 and rng.random() < 0.3 else f"{shown} views",
+                 "likes": likes, "comments": comments, "shares": shares}
+        elif platform == "youtube":
+            vid = f"{i:07x}{rng.getrandbits(16):04x}"
+            v = {"id": vid, "url": PLATFORM_URLS["youtube"].format(id=vid), "title": title, "views": str(shown),
+                 "likes": likes, "comments": comments, "shares": shares if rng.random() < 0.5 else None,
+                 "upload_date": time.strftime("%Y-%m-%d", time.gmtime(ts))}
+        else:
+            likes //= 4
+            v = {"id": 7_000_000_000_000_000_000 + i * 7919 + rng.getrandbits(12), "desc": title,
+                 "likes": f"{likes / 10000:.1f}万" if likes >= 10000 and rng.random() < 0.2 else likes,
+                 "comments": comments // 4, "favorites": likes // 10, "shares": shares // 4,
+                 "plays": views if rng.random() < 0.5 else 0, "createTime": ts}
+            yield v
+            continue
+        if rng.random() < 0.9:  # most arrive pre-tagged; the rest count as GROUP/UNKNOWN
+            v["members"] = members or ["GROUP/UNKNOWN"]
+        yield v
+
+
+def _write_json_array(f, records):
+    f.write("[")
+    for i, v in enumerate(records):
+        if i:
+            f.write(",\n")
+        f.write(json.dumps(v, ensure_ascii=False))
+    f.write("]")
+
+
+def generate_bench_data(out_dir: Path, rows: int, seed: int = 0, log=print) -> dict:
+    """Write synthetic ``ive_all_stats.json`` / ``douyin_full_stats.json`` with ``rows`` videos.
+
+    Output is a pure function of (rows, seed); an existing dataset with the
+    same parameters is reused.
+    """
+    counts = {p: int(rows * share) for p, share in BENCH_SPLIT.items()}
+    counts["douyin"] = rows - counts["tiktok"] - counts["youtube"]
+    marker = out_dir / "bench_dataset.json"
+    spec = {"version": BENCH_DATASET_VERSION, "rows": rows, "seed": seed, "counts": counts}
+    try:
+        if json.loads(marker.read_text(encoding="utf-8")) == spec:
+            return counts
+    except (OSError, ValueError):
+        pass
+    out_dir.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    with open(out_dir / "ive_all_stats.json", "w", encoding="utf-8") as f:
+        f.write('{"tiktok": ')
+        _write_json_array(f, _bench_records("tiktok", counts["tiktok"], seed))
+        f.write(', "youtube": ')
+        _write_json_array(f, _bench_records("youtube", counts["youtube"], seed))
+        f.write("}")
+    with open(out_dir / "douyin_full_stats.json", "w", encoding="utf-8") as f:
+        _write_json_array(f, _bench_records("douyin", counts["douyin"], seed))
+    # Stale caches would skew the load/tagging timings
+    cache_dir = out_dir / CACHE_DIRNAME
+    if cache_dir.is_dir():
+        for p in sorted(cache_dir.rglob("*"), reverse=True):
+            p.rmdir() if p.is_dir() else p.unlink()
+    (out_dir / SNAPSHOT_NAME).unlink(missing_ok=True)
+    marker.write_text(json.dumps(spec), encoding="utf-8")
+    log(f"Generated {rows:,} videos in {out_dir} ({time.perf_counter() - start:.1f}s)")
+    return counts
+
+
+def run_bench_suite(base_dir: Path, memory: bool = False, log=print) -> dict:
+    """Time (and optionally trace allocations of) each pipeline stage on ``base_dir``'s data."""
+    stages = {}
+
+    def timed(name, fn):
+        if memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            out = fn()
+        m = stages[name] = {"seconds": round(time.perf_counter() - start, 4)}
+        if memory:
+            m["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+            tracemalloc.stop()
+        if resource is not None:
+            rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            m["max_rss_mb"] = round(rss / (2**20 if sys.platform == "darwin" else 2**10), 1)
+        log(f"  {name:<8} {m['seconds']:9.3f}s" + (f"  peak {m['peak_mb']:,.1f} MB" if memory else ""))
+        return out
+
+    tags = base_dir / CACHE_DIRNAME / "member_tags.sqlite"
+    if tags.exists():
+        tags.unlink()  # cold tag cache: load includes tagging every untagged title
+    data = timed("load", lambda: load_data(base_dir))
+    titles = [t for p in PLATFORM_METRICS for t in data[p].titles]
+    timed("tagging", lambda: MemberMatcher(MEMBER_PATTERNS).match_many(titles))
+
+    results = {}
+
+    def stats():
+        data["solo"] = solo_tables(data)
+        for p in ["tiktok", "youtube", "douyin"]:
+            results[f"{p}_stats"] = compute_platform_stats(data[p])
+
+    def viral():
+        for p, metric_key, thresholds in [("tiktok", "views_num", TT_THRESHOLDS),
+                                          ("youtube", "views_num", YT_THRESHOLDS),
+                                          ("douyin", "likes", DY_THRESHOLDS)]:
+            results[f"{p}_viral"] = compute_viral_analysis(data[p], metric_key, thresholds)
+            results[f"solo_{p}_viral"] = compute_viral_analysis(data["solo"][p], metric_key, thresholds)
+
+    def trends():
+        for p, metric_key in TREND_METRICS.items():
+            results[f"{p}_trend_engine"] = engine = compute_trends(data[p], metric_key)
+            results[f"{p}_trends"] = engine.series("month")
+
+    timed("stats", stats)
+    timed("viral", viral)
+    timed("trends", trends)
+    analysis = _assemble_analysis(results, {p: len(t) for p, t in data["solo"].items()})
+    timed("csv", lambda: save_csvs(analysis, data, base_dir))
+    timed("json", lambda: save_json(analysis, base_dir / "ive_analysis.json"))
+    timed("html", lambda: generate_html(analysis, data, base_dir / "ive_report.html"))
+    return {"rows": {p: len(data[p]) for p in PLATFORM_METRICS}, "stages": stages}
+
+
+def compare_bench(results: dict, baseline: dict, tolerance: float = BENCH_TOLERANCE) -> list:
+    """``(size, stage, metric, baseline, current)`` for every stage that got worse."""
+    regressions = []
+    for size, run in results["runs"].items():
+        base = baseline.get("runs", {}).get(size)
+        if not base:
+            continue
+        for stage, m in run["stages"].items():
+            b = base["stages"].get(stage, {})
+            for metric in ("seconds", "peak_mb"):
+                old, new = b.get(metric), m.get(metric)
+                if old is not None and new is not None and new > old * (1 + tolerance) and new - old >= BENCH_MIN_DELTA:
+                    regressions.append((size, stage, metric, old, new))
+    return regressions
+
+
+def run_bench(args) -> int:
+    """The ``bench`` subcommand: generate, run every size, save results, compare to the baseline."""
+    bench_dir = Path(args.dir) if args.dir else BASE_DIR / CACHE_DIRNAME / "bench"
+    results = {"seed": args.seed, "python": sys.version.split()[0], "platform": sys.platform,
+               "date": datetime.now().isoformat(timespec="seconds"), "runs": {}}
+    for label in args.sizes.split(","):
+        rows = parse_size(label)
+        label = next((k for k, v in BENCH_SIZES.items() if v == rows), label.strip())
+        print(f"\n{label} rows (seed {args.seed})")
+        run_dir = bench_dir / f"rows_{rows}"
+        generate_bench_data(run_dir, rows, args.seed)
+        results["runs"][label] = run_bench_suite(run_dir, memory=args.memory)
+
+    output = Path(args.output) if args.output else bench_dir / BENCH_RESULTS
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(f"\nSaved results: {output}")
+
+    baseline_path = Path(args.baseline) if args.baseline else BASE_DIR / BENCH_BASELINE
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Saved baseline: {baseline_path}")
+        return 0
+    try:
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        print(f"No baseline at {baseline_path} (save one with --save-baseline)")
+        return 0
+    regressions = compare_bench(results, baseline, args.tolerance)
+    for size, stage, metric, old, new in regressions:
+        print(f"REGRESSION {size} {stage}: {metric} {old:g} -> {new:g} (+{(new / old - 1) * 100 if old else float('inf'):.0f}%)")
+    if not regressions:
+        print(f"No regressions against {baseline_path.name} (tolerance {args.tolerance:.0%})")
+    return 1 if regressions else 0
 
 
 # ─── Main ───────────────────────────────────────────────────────────────────
 
 
-def main():
-    data = load_data()
+def solo_tables(data: dict) -> dict:
+    """Per platform, the videos with exactly 1 identified member (not GROUP/UNKNOWN)."""
+    return {p: data[p].take(data[p].solo_rows()) for p in ["tiktok", "youtube", "douyin"]}
 
-    analysis = {}
 
-    # Member rankings
-    analysis["tiktok_rankings"] = compute_member_stats(data["tiktok"], "views_num")
-    analysis["youtube_rankings"] = compute_member_stats(data["youtube"], "views_num")
-    analysis["douyin_rankings"] = compute_member_stats(data["douyin"], "likes")
+def analysis_stages(granularities=DEFAULT_TREND_GRANULARITIES) -> list:
+    """CPU stages of the analysis; inputs are the platform and solo_<platform> tables."""
+    stages = []
+    # Member rankings: one fused pass per platform covers every metric, all + solo
+    for p in ["tiktok", "youtube", "douyin"]:
+        stages.append(Stage(f"{p}_stats", compute_platform_stats, [p]))
+    # Viral analysis, all videos and solo
+    for p, metric_key, thresholds in [
+        ("tiktok", "views_num", TT_THRESHOLDS),
+        ("youtube", "views_num", YT_THRESHOLDS),
+        ("douyin", "likes", DY_THRESHOLDS),
+    ]:
+        fn = partial(compute_viral_analysis, metric_key=metric_key, thresholds=thresholds)
+        stages.append(Stage(f"{p}_viral", fn, [p]))
+        stages.append(Stage(f"solo_{p}_viral", fn, [f"solo_{p}"]))
+    # Time trends: one engine per platform holds every granularity asked for
+    for p, metric_key in TREND_METRICS.items():
+        fn = partial(compute_trends, metric_key=metric_key, granularities=granularities)
+        stages.append(Stage(f"{p}_trends", fn, [p]))
+    return stages
+
+
+def analyze(data: dict, jobs: int = 1, engines: dict | None = None,
+            granularities=DEFAULT_TREND_GRANULARITIES) -> dict:
+    """Run the analysis stages; current trend ``engines`` (see ``append``) replace the trend stages."""
+    tables = {p: data[p] for p in ["tiktok", "youtube", "douyin"]}
+    tables.update({f"solo_{p}": t for p, t in data["solo"].items()})
+    stages = analysis_stages(granularities)
+    if engines is not None:
+        stages = [st for st in stages if not st.name.endswith("_trends")]
+    results = run_stages(stages, tables, jobs)
+    for p in TREND_METRICS:
+        results[f"{p}_trend_engine"] = engine = engines[p] if engines is not None else results[f"{p}_trends"]
+        results[f"{p}_trends"] = engine.series("month")
+    return _assemble_analysis(results, {p: len(t) for p, t in data["solo"].items()})
+
+
+def analyze_store(store: AnalysisStore, granularities=DEFAULT_TREND_GRANULARITIES) -> dict:
+    """``analyze`` with every stage run as queries against an ``AnalysisStore``."""
+    results = {}
+    for p in ["tiktok", "youtube", "douyin"]:
+        results[f"{p}_stats"] = store.platform_stats(p)
+    for p, metric_key, thresholds in [
+        ("tiktok", "views_num", TT_THRESHOLDS),
+        ("youtube", "views_num", YT_THRESHOLDS),
+        ("douyin", "likes", DY_THRESHOLDS),
+    ]:
+        results[f"{p}_viral"] = store.viral_analysis(p, metric_key, thresholds)
+        results[f"solo_{p}_viral"] = store.viral_analysis(p, metric_key, thresholds, solo=True)
+    for p, metric_key in TREND_METRICS.items():
+        results[f"{p}_trends"] = store.time_trends(p, metric_key)
+        results[f"{p}_trend_engine"] = store.trend_engine(p, metric_key, granularities)
+    return _assemble_analysis(results, {p: store.count(p, solo=True) for p in ["tiktok", "youtube", "douyin"]})
+
+
+def _assemble_analysis(results: dict, solo_counts: dict) -> dict:
+    """The analysis dict from the per-stage results (see ``analysis_stages``)."""
+    analysis = {}
+    stats = {p: results[f"{p}_stats"] for p in ["tiktok", "youtube", "douyin"]}
+    tt, yt, dy = stats["tiktok"], stats["youtube"], stats["douyin"]
+    analysis["tiktok_rankings"] = tt["all"]["views_num"]
+    analysis["youtube_rankings"] = yt["all"]["views_num"]
+    analysis["douyin_rankings"] = dy["all"]["likes"]
 
     # Engagement rankings by likes/comments/shares (all platforms)
-    analysis["tiktok_likes_rankings"] = compute_member_stats(data["tiktok"], "likes")
-    analysis["tiktok_comments_rankings"] = compute_member_stats(data["tiktok"], "comments")
-    analysis["tiktok_shares_rankings"] = compute_member_stats(data["tiktok"], "shares")
-    analysis["youtube_likes_rankings"] = compute_member_stats(data["youtube"], "likes")
-    analysis["youtube_comments_rankings"] = compute_member_stats(data["youtube"], "comments")
-    analysis["youtube_shares_rankings"] = compute_member_stats(data["youtube"], "shares")
-    analysis["douyin_comments_rankings"] = compute_member_stats(data["douyin"], "comments")
-    analysis["douyin_favorites_rankings"] = compute_member_stats(data["douyin"], "favorites")
-    analysis["douyin_shares_rankings"] = compute_member_stats(data["douyin"], "shares")
+    analysis["tiktok_likes_rankings"] = tt["all"]["likes"]
+    analysis["tiktok_comments_rankings"] = tt["all"]["comments"]
+    analysis["tiktok_shares_rankings"] = tt["all"]["shares"]
+    analysis["youtube_likes_rankings"] = yt["all"]["likes"]
+    analysis["youtube_comments_rankings"] = yt["all"]["comments"]
+    analysis["youtube_shares_rankings"] = yt["all"]["shares"]
+    analysis["douyin_comments_rankings"] = dy["all"]["comments"]
+    analysis["douyin_favorites_rankings"] = dy["all"]["favorites"]
+    analysis["douyin_shares_rankings"] = dy["all"]["shares"]
 
     # Viral analysis
-    analysis["tiktok_viral"] = compute_viral_analysis(data["tiktok"], "views_num", [5_000_000, 10_000_000, 20_000_000])
-    analysis["youtube_viral"] = compute_viral_analysis(data["youtube"], "views_num", [2_000_000, 5_000_000, 10_000_000])
-    analysis["douyin_viral"] = compute_viral_analysis(data["douyin"], "likes", [200_000, 500_000, 1_000_000])
+    analysis["tiktok_viral"] = results["tiktok_viral"]
+    analysis["youtube_viral"] = results["youtube_viral"]
+    analysis["douyin_viral"] = results["douyin_viral"]
 
-    # Time trends
-    analysis["tiktok_trends"] = compute_time_trends(data["tiktok"], "views_num")
-    analysis["douyin_trends"] = compute_time_trends(data["douyin"], "likes")
+    # Time trends (monthly series; the engines keep every granularity asked for)
+    for p in TREND_METRICS:
+        analysis[f"{p}_trends"] = results[f"{p}_trends"]
+    analysis["trend_engines"] = {p: results[f"{p}_trend_engine"] for p in TREND_METRICS}
 
     # ── Single-member video analysis ──
-    # Filter to videos with exactly 1 identified member (not GROUP/UNKNOWN)
-    solo = {}
-    for platform_key in ["tiktok", "youtube", "douyin"]:
-        solo[platform_key] = [
-            v for v in data[platform_key]
-            if len(v.get("members", [])) == 1 and v["members"][0] != "GROUP/UNKNOWN"
-        ]
-    analysis["solo_tiktok_rankings"] = compute_member_stats(solo["tiktok"], "views_num")
-    analysis["solo_tiktok_likes"] = compute_member_stats(solo["tiktok"], "likes")
-    analysis["solo_tiktok_comments"] = compute_member_stats(solo["tiktok"], "comments")
-    analysis["solo_tiktok_shares"] = compute_member_stats(solo["tiktok"], "shares")
-    analysis["solo_youtube_rankings"] = compute_member_stats(solo["youtube"], "views_num")
-    analysis["solo_youtube_likes"] = compute_member_stats(solo["youtube"], "likes")
-    analysis["solo_youtube_comments"] = compute_member_stats(solo["youtube"], "comments")
-    analysis["solo_youtube_shares"] = compute_member_stats(solo["youtube"], "shares")
-    analysis["solo_douyin_rankings"] = compute_member_stats(solo["douyin"], "likes")
-    analysis["solo_douyin_comments"] = compute_member_stats(solo["douyin"], "comments")
-    analysis["solo_douyin_favorites"] = compute_member_stats(solo["douyin"], "favorites")
-    analysis["solo_douyin_shares"] = compute_member_stats(solo["douyin"], "shares")
+    analysis["solo_tiktok_rankings"] = tt["solo"]["views_num"]
+    analysis["solo_tiktok_likes"] = tt["solo"]["likes"]
+    analysis["solo_tiktok_comments"] = tt["solo"]["comments"]
+    analysis["solo_tiktok_shares"] = tt["solo"]["shares"]
+    analysis["solo_youtube_rankings"] = yt["solo"]["views_num"]
+    analysis["solo_youtube_likes"] = yt["solo"]["likes"]
+    analysis["solo_youtube_comments"] = yt["solo"]["comments"]
+    analysis["solo_youtube_shares"] = yt["solo"]["shares"]
+    analysis["solo_douyin_rankings"] = dy["solo"]["likes"]
+    analysis["solo_douyin_comments"] = dy["solo"]["comments"]
+    analysis["solo_douyin_favorites"] = dy["solo"]["favorites"]
+    analysis["solo_douyin_shares"] = dy["solo"]["shares"]
     # Solo viral analysis
-    analysis["solo_tiktok_viral"] = compute_viral_analysis(solo["tiktok"], "views_num", [5_000_000, 10_000_000, 20_000_000])
-    analysis["solo_youtube_viral"] = compute_viral_analysis(solo["youtube"], "views_num", [2_000_000, 5_000_000, 10_000_000])
-    analysis["solo_douyin_viral"] = compute_viral_analysis(solo["douyin"], "likes", [200_000, 500_000, 1_000_000])
-    analysis["solo_counts"] = {p: len(solo[p]) for p in solo}
-    data["solo"] = solo
+    analysis["solo_tiktok_viral"] = results["solo_tiktok_viral"]
+    analysis["solo_youtube_viral"] = results["solo_youtube_viral"]
+    analysis["solo_douyin_viral"] = results["solo_douyin_viral"]
+    analysis["solo_counts"] = solo_counts
+
+    # Per member per metric quantile sketches (all + solo), used by the report
+    analysis["sketches"] = {p: stats[p]["sketches"] for p in stats}
+    return analysis
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="IVE cross-platform member analysis")
+    parser.add_argument("--force", action="store_true", help="ignore the stage cache and rebuild every output")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1,
+                        help="worker processes/threads for independent stages (default: all cores; 1 = serial)")
+    parser.add_argument("--gzip-data", action="store_true",
+                        help="store the report's chart data block gzipped + base64 (smaller file, decoded in the browser)")
+    parser.add_argument("--eager-panels", action="store_true",
+                        help="render every tab panel's tables up front as markup (larger file; by default only "
+                             "each section's first tab is, the rest are built from the data block on first open)")
+    parser.add_argument("--lazy-panels", action="store_true", help=argparse.SUPPRESS)  # the default now
+    parser.add_argument("--source", choices=("auto", "raw", "csv"), default="auto",
+                        help=f"load the raw scrape JSON or {FULL_DATA_CSV} (default: raw when present, else csv)")
+    parser.add_argument("--store", nargs="?", const=STORE_NAME, default=None, metavar="PATH",
+                        help=f"run the analysis as queries on a sqlite store (default path: {STORE_NAME})")
+    parser.add_argument("--granularities", default=",".join(DEFAULT_TREND_GRANULARITIES),
+                        help=f"comma-separated trend granularities for ive_trends.csv, from "
+                             f"{','.join(TREND_GRANULARITIES)} (default: month)")
+    commands = parser.add_subparsers(dest="command")
+    q = commands.add_parser("query", help="answer one filtered aggregation from the prebuilt snapshot",
+                            description="Per-member stats for a filtered set of videos, read from "
+                                        f"{SNAPSHOT_NAME} (built first if missing or stale).")
+    q.add_argument("--platform", "-p", action="append", choices=("tiktok", "youtube", "douyin"),
+                   help="platform(s) to query (repeatable; default: all)")
+    q.add_argument("--members", "-m", help="comma-separated members, e.g. GAEUL or REI,LIZ (default: everyone)")
+    q.add_argument("--together", action="store_true", help="only videos tagged with all of --members")
+    q.add_argument("--solo", action="store_true", help="only videos with exactly one identified member")
+    q.add_argument("--since", help="first date, inclusive: YYYY, YYYY-MM or YYYY-MM-DD")
+    q.add_argument("--until", help="last date, inclusive: YYYY, YYYY-MM or YYYY-MM-DD")
+    q.add_argument("--metric", choices=tuple(QUERY_METRICS), default="likes", help="metric to aggregate (default: likes)")
+    q.add_argument("--percentiles", help="extra percentile columns, e.g. 10,50,90")
+    q.add_argument("--top", type=int, default=5, help="list the top K videos (default: 5; 0 = none)")
+    sv = commands.add_parser("serve", help="JSON API over ive_analysis.json with ETag + gzip, hot-reloaded",
+                             description="Serve rankings, viral, top-video and trend results as JSON "
+                                         "endpoints under /api; see /api for the list.")
+    sv.add_argument("--host", default="127.0.0.1", help="bind address (default: 127.0.0.1)")
+    sv.add_argument("--port", type=int, default=8765, help="port (default: 8765; 0 = any free port)")
+    sv.add_argument("--threads", type=int, default=16, help="request handler threads (default: 16)")
+    sv.add_argument("--quiet", action="store_true", help="do not log each request")
+    ap = commands.add_parser("append", help="ingest a new scrape batch: insert new videos, update known ones in place",
+                             description="Merge BATCH into the loaded data by (platform, video id). Full reloads "
+                                         "replay every appended batch on top of the sources.")
+    ap.add_argument("batch", help="JSON file: an object with tiktok/youtube/douyin arrays, or one bare array")
+    ap.add_argument("--platform", "-p", choices=BATCH_PLATFORMS, help="platform of a bare-array batch")
+    bn = commands.add_parser("bench", help="time and memory-profile every stage on synthetic data",
+                             description="Generate seeded synthetic inputs at each size, run the pipeline "
+                                         f"stage by stage and compare against a baseline ({BENCH_BASELINE}).")
+    bn.add_argument("--sizes", default="10k", help=f"comma-separated row counts, e.g. {','.join(BENCH_SIZES)} (default: 10k)")
+    bn.add_argument("--seed", type=int, default=0, help="generator seed (default: 0)")
+    bn.add_argument("--dir", help=f"where generated data lives (default: {CACHE_DIRNAME}/bench)")
+    bn.add_argument("--output", help=f"results file (default: <dir>/{BENCH_RESULTS})")
+    bn.add_argument("--baseline", help=f"baseline results to compare with (default: {BENCH_BASELINE})")
+    bn.add_argument("--save-baseline", action="store_true", help="store this run as the baseline instead of comparing")
+    bn.add_argument("--tolerance", type=float, default=BENCH_TOLERANCE,
+                    help=f"allowed slowdown before a stage is flagged (default: {BENCH_TOLERANCE})")
+    bn.add_argument("--memory", action="store_true", help="also trace each stage's peak Python allocations (slower)")
+    args = parser.parse_args(argv)
+    if args.command == "bench":
+        return run_bench(args)
+    wanted = {g.strip() for g in args.granularities.split(",") if g.strip()}
+    if wanted - set(TREND_GRANULARITIES):
+        parser.error(f"unknown granularity: {', '.join(sorted(wanted - set(TREND_GRANULARITIES)))}")
+    # The monthly series always needs the month cells
+    granularities = tuple(g for g in TREND_GRANULARITIES if g in wanted | {"month"})
+    if args.command == "serve":
+        return run_server(args)
+    from_csv = args.source == "csv" or (args.source == "auto" and not raw_sources_present())
+
+    # Each stage is keyed by a content hash of its inputs; unchanged stages are skipped
+    cache = StageCache(BASE_DIR / CACHE_DIRNAME / "stages", force=args.force)
+    sources = [FULL_DATA_CSV] if from_csv else SOURCE_FILES
+    batch_hashes = [b["hash"] for b in applied_batches()]
+    batch_key = partial(cache.hash, Path(__file__), from_csv, *(BASE_DIR / n for n in sources), MEMBER_PATTERNS,
+                        *batch_hashes)
+    load_key = batch_key()
+
+    data = None
+    snapshot_path = BASE_DIR / SNAPSHOT_NAME
+
+    def get_data(with_solo=True):
+        nonlocal data
+        if data is None:
+            # The load stage's output is the binary snapshot, mapped back in on re-runs
+            if cache.fresh("load", load_key, [snapshot_path]):
+                data = load_snapshot(snapshot_path, batch_hashes)
+            if data is None:
+                data = load_data_csv() if from_csv else load_data()
+                replay_batches(data)
+                save_snapshot(data, snapshot_path, batch_hashes)
+                cache.done("load", load_key)
+        if with_solo and "solo" not in data:
+            data["solo"] = solo_tables(data)
+        return data
+
+    if args.command == "query":
+        return run_query(args, partial(get_data, with_solo=False))
+    if args.command == "append":
+        return run_append(args, get_data, cache, load_key, batch_key)
+
+    analyze_key = content_hash(load_key, TT_THRESHOLDS, YT_THRESHOLDS, DY_THRESHOLDS, granularities)
+    html_key = cache.hash(analyze_key, *(BASE_DIR / n for n in ANALYSIS_FILES), TT_TIERS, YT_TIERS, DY_TIERS,
+                          args.gzip_data, args.eager_panels)
+
+    store = None
+    if args.store:
+        # Kept in sync with the loaded data; reloaded only when the load stage's inputs change
+        store = AnalysisStore(BASE_DIR / args.store)
+        if store.key != load_key:
+            store.load(get_data(), load_key)
+            print(f"Saved store: {store.path}")
+
+    analysis = cache.load("analyze") if cache.fresh("analyze", analyze_key) else None
+    if analysis is None:
+        engines = cache.load("trends") if cache.fresh("trends", load_key) else None
+        if engines and any(e.granularities != granularities for e in engines.values()):
+            engines = None  # built for other --granularities
+        analysis = (analyze_store(store, granularities) if store
+                    else analyze(get_data(), args.jobs, engines, granularities))
+        cache.done("analyze", analyze_key, analysis)
+        if engines is None:
+            cache.done("trends", load_key, analysis["trend_engines"])
+    if store:
+        store.close()
 
     # Output
     print_terminal_summary(analysis)
-    save_json(analysis, BASE_DIR / "ive_analysis.json")
-    save_csvs(analysis, data, BASE_DIR)
-    generate_html(analysis, data, BASE_DIR / "ive_report.html")
+
+    json_path = BASE_DIR / "ive_analysis.json"
+    # The full-data CSV is never rewritten while it is the input
+    csv_paths = [BASE_DIR / n for n in (
+        "ive_member_rankings.csv", "ive_viral_top_videos.csv",
+        "ive_monthly_trends.csv", "ive_trends.csv", *([] if from_csv else [FULL_DATA_CSV]),
+    )]
+    html_path = BASE_DIR / "ive_report.html"
+    # Writers are independent of each other and run on the thread pool
+    writers = []
+    if cache.fresh("json", analyze_key, [json_path]):
+        print(f"\nUnchanged: {json_path}")
+    else:
+        writers.append(Stage("json", partial(save_json, path=json_path), ["analysis"], "io", log=True))
+    if cache.fresh("csv", analyze_key, csv_paths):
+        print("Unchanged: CSV files")
+    else:
+        writers.append(Stage("csv", partial(save_csvs, base_dir=BASE_DIR, full_data=not from_csv),
+                             ["analysis", "data"], "io", log=True))
+    if cache.fresh("html", html_key, [html_path]):
+        print(f"Unchanged: {html_path}")
+    else:
+        writers.append(Stage("html", partial(generate_html, path=html_path, jobs=args.jobs,
+                                                     compress_data=args.gzip_data, lazy=not args.eager_panels),
+                             ["analysis", "data"], "main", log=True))
+    if writers:
+        needs_data = any("data" in st.inputs for st in writers)
+        run_stages(writers, {"analysis": analysis, "data": get_data() if needs_data else None}, args.jobs)
+        for st in writers:
+            cache.done(st.name, html_key if st.name == "html" else analyze_key)
 
     print("\nDone! Open ive_report.html in a browser to see the interactive report.")
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
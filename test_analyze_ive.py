@@ -0,0 +1,224 @@
+"""Unit tests for analyze_ive.py (stdlib unittest): python -m unittest -q test_analyze_ive"""
+
+import io
+import json
+import random
+import tempfile
+import unittest
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+
+import analyze_ive as ive
+
+
+# ─── Quantile Sketch ────────────────────────────────────────────────────────
+
+
+class QuantileSketchTest(unittest.TestCase):
+    def check_ranks(self, sketch, values):
+        """Every answered rank must be within ``rank_error`` of the value's true rank range."""
+        values = sorted(values)
+        self.assertEqual(sketch.n, len(values))
+        for rank in range(0, len(values), max(1, len(values) // 500)):
+            got = sketch.at_rank(rank)
+            lo, hi = bisect_left(values, got), bisect_right(values, got) - 1
+            if rank < lo:
+                self.assertLessEqual(lo - rank, sketch.rank_error, f"rank {rank}: {got!r}")
+            elif rank > hi:
+                self.assertLessEqual(rank - hi, sketch.rank_error, f"rank {rank}: {got!r}")
+
+    def test_exact_before_first_compaction(self):
+        values = [random.Random(1).randrange(10**6) for _ in range(ive.SKETCH_K - 1)]
+        sketch = ive.QuantileSketch()
+        sketch.extend(values)
+        self.assertEqual(sketch.rank_error, 0)
+        values.sort()
+        self.assertEqual([sketch.at_rank(r) for r in range(len(values))], values)
+
+    def test_rank_error_bound(self):
+        rng = random.Random(2)
+        for values in ([rng.randrange(10**9) for _ in range(50_000)],
+                       [int(rng.paretovariate(1.2) * 100) for _ in range(50_000)],  # heavy tail, many ties
+                       list(range(30_000, 0, -1))):
+            sketch = ive.QuantileSketch(k=64)
+            for v in values:
+                sketch.add(v)
+            self.assertGreater(sketch.rank_error, 0)
+            self.check_ranks(sketch, values)
+
+    def test_merge_and_round_trip(self):
+        rng = random.Random(3)
+        shards = [[rng.randrange(10**6) for _ in range(rng.randrange(1, 20_000))] for _ in range(6)]
+        merged = ive.QuantileSketch(k=64)
+        for shard in shards:
+            sketch = ive.QuantileSketch(k=64)
+            sketch.extend(shard)
+            merged.merge(ive.QuantileSketch.from_dict(json.loads(json.dumps(sketch.to_dict()))))
+        self.check_ranks(merged, [v for shard in shards for v in shard])
+
+
+# ─── Streaming JSON ─────────────────────────────────────────────────────────
+
+
+def _stream(text: str, chunk_size: int) -> ive._JsonStream:
+    f = io.StringIO(text)
+    f.name = "<test>"
+    return ive._JsonStream(f, chunk_size)
+
+
+class JsonStreamTest(unittest.TestCase):
+    RECORDS = [
+        {"id": "7301234567890123456", "views": 1234567, "ratio": -0.000123, "big": 12345678901234567890},
+        {"title": "장원영 ❤️ \"quoted\" \\ back\\slash 😀", "tags": [], "nested": {"a": [1, 2.5e-3, None]}},
+        {"empty": "", "t": True, "f": False, "n": None, "exp": 1E+21, "neg": -0},
+        [], {}, 0, "plain string", 3.14159,
+    ]
+
+    def documents(self):
+        compact = json.dumps(self.RECORDS, ensure_ascii=False, separators=(",", ":"))
+        yield compact
+        yield json.dumps(self.RECORDS, ensure_ascii=True, indent=2)
+        yield " \n\t" + compact.replace(",", " ,\r\n ") + "\n"
+
+    def test_array_matches_json_load(self):
+        for text in self.documents():
+            expected = json.loads(text)
+            for chunk_size in (1, 2, 3, 5, 7, 16):
+                with self.subTest(chunk_size=chunk_size, text=text[:20]):
+                    self.assertEqual(list(_stream(text, chunk_size).iter_array()), expected)
+
+    def test_numbers_split_at_chunk_edges(self):
+        # Each number ends exactly on a chunk boundary for some chunk size
+        values = [1, 12, 123, 1234, 12345, -98765, 1.5, 2.25e10, 10**20]
+        text = json.dumps(values, separators=(",", ":"))
+        for chunk_size in range(1, len(text) + 1):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(list(_stream(text, chunk_size).iter_array()), values)
+
+    def test_seek_key(self):
+        doc = {"meta": {"skip": [1, {"tiktok": "no"}]}, "other": [[1], "x"], "tiktok": self.RECORDS, "after": 1}
+        text = json.dumps(doc)
+        for chunk_size in (1, 4, 64):
+            stream = _stream(text, chunk_size)
+            self.assertTrue(stream.seek_key("tiktok"))
+            self.assertEqual(list(stream.iter_array()), self.RECORDS)
+            self.assertFalse(_stream(text, chunk_size).seek_key("youtube"))
+
+    def test_iter_json_array_file(self):
+        ijson, chunk_size = ive.ijson, ive.JSON_CHUNK_SIZE
+        ive.ijson = None
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                path = Path(tmp) / "videos.json"
+                path.write_text(json.dumps({"youtube": self.RECORDS}, ensure_ascii=False), encoding="utf-8")
+                for size in (1, 3, 1 << 16):
+                    ive.JSON_CHUNK_SIZE = size
+                    self.assertEqual(list(ive.iter_json_array(path, "youtube")), self.RECORDS)
+                path.write_text(json.dumps({"youtube": None}), encoding="utf-8")
+                self.assertEqual(list(ive.iter_json_array(path, "youtube")), [])
+                path.write_text(json.dumps({"youtube": 1}), encoding="utf-8")
+                with self.assertRaises(ValueError):
+                    list(ive.iter_json_array(path, "youtube"))
+        finally:
+            ive.ijson, ive.JSON_CHUNK_SIZE = ijson, chunk_size
+
+    def test_truncated_input_raises(self):
+        text = json.dumps(self.RECORDS)[:-5]
+        with self.assertRaises(ValueError):  # JSONDecodeError is a ValueError
+            list(_stream(text, 4).iter_array())
+
+
+# ─── Snapshot ───────────────────────────────────────────────────────────────
+
+
+def _sample_data() -> dict:
+    rng = random.Random(4)
+    data = {}
+    for platform, metrics in ive.PLATFORM_METRICS.items():
+        table = ive.VideoTable(platform)
+        for i in range(50):
+            entry = {
+                "id": f"{platform}-{i}", "title": f"영상 {i} 🎀" if i % 3 else "",
+                "url": f"https://example.com/{platform}/{i}",
+                "members": rng.sample(ive.MEMBERS_ORDER[:6], rng.randrange(0, 3)) or ["GROUP/UNKNOWN"],
+                "date": None if i % 7 == 0 else f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+            }
+            entry["month"] = entry["date"][:7] if entry["date"] else None
+            for k in metrics:
+                entry[k] = None if i % 11 == 5 else rng.randrange(10**9)
+            if "views_num" in metrics:
+                entry["views_str"] = str(entry["views_num"] or "")
+            table.append(entry)
+        data[platform] = table
+    data["tiktok"].append({"id": "new-member", "members": ["NEWCOMER"], "views_num": 1})
+    return data
+
+
+def _rows(table) -> list:
+    return [dict(v) for v in table.rows()]
+
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / ive.SNAPSHOT_NAME
+        self.data = _sample_data()
+        self.expected = {p: _rows(t) for p, t in self.data.items()}
+        ive.save_snapshot(self.data, self.path, batches=["abc"], log=lambda *a: None)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        with ive.Snapshot(self.path) as snap:
+            self.assertEqual(snap.batches, ["abc"])
+            self.assertEqual(len(snap), sum(map(len, self.data.values())))
+            for platform, table in self.data.items():
+                self.assertEqual(snap.strings(platform, "titles"), table.titles)
+                self.assertEqual(snap.string(platform, "dates", 0), table.dates[0])
+        loaded = ive.load_snapshot(self.path, batches=["abc"])
+        for platform, table in loaded.items():
+            self.assertTrue(table._mapped)
+            self.assertEqual(table.member_names, self.data[platform].member_names)
+            self.assertEqual(_rows(table), self.expected[platform])
+
+    def test_stale_or_foreign_snapshot(self):
+        self.assertIsNone(ive.load_snapshot(self.path, batches=[]))
+        self.assertIsNone(ive.load_snapshot(Path(self.tmp.name) / "missing.snap"))
+        bad = Path(self.tmp.name) / "bad.snap"
+        bad.write_bytes(b"not a snapshot at all")
+        self.assertIsNone(ive.load_snapshot(bad))
+
+    def test_copy_on_write(self):
+        before = self.path.read_bytes()
+        loaded = ive.load_snapshot(self.path, batches=["abc"])
+        table = loaded["tiktok"]
+        row = dict(self.expected["tiktok"][3], title="edited", likes=None, members=["REI", "LIZ", "YUJIN"])
+        table.update(3, row)
+        table.append(dict(self.expected["tiktok"][0], id="appended"))
+        self.assertFalse(table._mapped)
+        self.assertEqual(table.row(3)["title"], "edited")
+        self.assertEqual(table.row(3)["members"], ["REI", "LIZ", "YUJIN"])
+        self.assertIn(3, table.rows_with("LIZ"))
+        self.assertEqual(_rows(table)[4:-1], self.expected["tiktok"][4:])
+        # The file and a fresh mapping of it are untouched
+        self.assertEqual(self.path.read_bytes(), before)
+        fresh = ive.load_snapshot(self.path, batches=["abc"])
+        self.assertEqual(_rows(fresh["tiktok"]), self.expected["tiktok"])
+        # Untouched tables of the same load stay mapped
+        self.assertTrue(loaded["youtube"]._mapped)
+        self.assertEqual(_rows(loaded["youtube"]), self.expected["youtube"])
+
+    def test_resave_after_update(self):
+        loaded = ive.load_snapshot(self.path, batches=["abc"])
+        loaded["douyin"].update(0, dict(self.expected["douyin"][0], plays=7))
+        again = Path(self.tmp.name) / "again.snap"
+        ive.save_snapshot(loaded, again, batches=["abc", "def"], log=lambda *a: None)
+        reloaded = ive.load_snapshot(again, batches=["abc", "def"])
+        self.assertEqual(reloaded["douyin"].row(0)["plays"], 7)
+        for platform in ("tiktok", "youtube"):
+            self.assertEqual(_rows(reloaded[platform]), self.expected[platform])
+
+
+if __name__ == "__main__":
+    unittest.main()